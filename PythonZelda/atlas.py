@@ -0,0 +1,112 @@
+"""
+File packs the animation frames under graphics/ into a few large sheets with a json index
+and loads them back as subsurfaces, so starting the game opens a handful of files instead of hundreds
+
+index layout:
+    sheets      file names of the packed sheets, next to the index
+    folders     per frame folder a list of [sheet, x, y, width, height], in sorted file name order
+
+run as a script to build the atlas:
+    python atlas.py graphics/atlas
+"""
+import os
+import sys
+import json
+import pygame
+from os import path as os_path
+from support import FRAME_ROOTS, frame_files, frame_folders
+
+ATLAS_ROOTS = FRAME_ROOTS
+SHEET_SIZE = 2048
+PADDING = 1
+
+def pack(sizes, sheet_size = SHEET_SIZE, padding = PADDING):
+    """
+    shelf packs (width, height) sizes into square sheets, tallest first,
+    returns a (sheet, x, y) placement per size in the order given
+    """
+
+    placements = [None] * len(sizes)
+    order = sorted(range(len(sizes)), key = lambda index: (-sizes[index][1], -sizes[index][0], index))
+
+    sheet = 0
+    x = y = shelf_height = 0
+    for index in order:
+        width, height = sizes[index]
+        if width + padding > sheet_size or height + padding > sheet_size:
+            raise ValueError(f'a {width}x{height} frame does not fit a {sheet_size} sheet')
+
+        if x + width + padding > sheet_size:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        if y + height + padding > sheet_size:
+            sheet += 1
+            x = y = shelf_height = 0
+
+        placements[index] = (sheet, x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height + padding)
+
+    return placements
+
+def build_atlas(out_dir, roots = ATLAS_ROOTS, sheet_size = SHEET_SIZE):
+    """
+    packs every frame folder below the roots into sheets and writes them with atlas.json into out_dir
+    """
+
+    frames = []
+    for folder in frame_folders(roots):
+        for file_name in frame_files(folder):
+            frames.append((folder, pygame.image.load(folder + '/' + file_name).convert_alpha()))
+
+    placements = pack([frame.get_size() for _, frame in frames], sheet_size)
+    sheet_count = max(sheet for sheet, _, _ in placements) + 1
+
+    #trim the last shelf of every sheet so sheets are no bigger than they need to be
+    extents = [[0, 0] for _ in range(sheet_count)]
+    for (sheet, x, y), (_, frame) in zip(placements, frames):
+        extents[sheet][0] = max(extents[sheet][0], x + frame.get_width())
+        extents[sheet][1] = max(extents[sheet][1], y + frame.get_height())
+
+    sheets = [pygame.Surface(extent, pygame.SRCALPHA) for extent in extents]
+    folders = {}
+    for (sheet, x, y), (folder, frame) in zip(placements, frames):
+        sheets[sheet].blit(frame, (x, y))
+        folders.setdefault(folder, []).append([sheet, x, y, frame.get_width(), frame.get_height()])
+
+    os.makedirs(out_dir, exist_ok = True)
+    sheet_names = []
+    for index, surf in enumerate(sheets):
+        sheet_names.append(f'sheet_{index}.png')
+        pygame.image.save(surf, os_path.join(out_dir, sheet_names[-1]))
+
+    with open(os_path.join(out_dir, 'atlas.json'), 'w') as index_file:
+        json.dump({'sheets': sheet_names, 'folders': folders}, index_file, indent = 1)
+
+    return len(frames), len(sheets)
+
+def load_atlas(index_path):
+    """
+    loads the sheets of an atlas and returns a folder to frame list dictionary of subsurfaces
+    """
+
+    with open(index_path) as index_file:
+        index = json.load(index_file)
+
+    base = os_path.dirname(index_path)
+    sheets = [pygame.image.load(os_path.join(base, name)).convert_alpha() for name in index['sheets']]
+
+    return {folder: [sheets[sheet].subsurface((x, y, width, height)) for sheet, x, y, width, height in frames]
+        for folder, frames in index['folders'].items()}
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print('usage: python atlas.py <output folder>')
+        sys.exit(1)
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    pygame.display.set_mode((1,1))
+    frame_count, sheet_count = build_atlas(sys.argv[1])
+    print(f'packed {frame_count} frames into {sheet_count} sheets in {sys.argv[1]}')
@@ -0,0 +1,205 @@
+"""
+Batch runner for balance tuning
+Spreads many independent headless Level runs over a pool of processes, each run with its
+own seed, key policy and overrides of the settings tables, and sums up what came back.
+run from the folder holding map/ and graphics/ like the game itself
+
+a runs file is a json list of runs, every field is optional:
+    [{"seed": 1, "policy": "hunt", "frames": 3600,
+      "monster_data": {"raccoon": {"damage": 20}}, "weapon_data": {"sword": {"damage": 25}}}]
+
+usage: python batch_sim.py [runs.json] [--runs N] [--policy hunt] [--frames N] [--workers N] [--out results.jsonl]
+"""
+import os
+import json
+import time
+import random
+import argparse
+import settings
+from copy import deepcopy
+from multiprocessing import get_context
+from headless import HeadlessSim
+from controls import KeyState, ScriptedKeys
+from benchmark_game import WALK, FIGHT, FLAME
+from settings import *
+import pygame
+
+#tables a run may override, as they were before any override
+TUNABLE = ('monster_data', 'weapon_data', 'magic_data')
+BASE_TABLES = {name: deepcopy(getattr(settings, name)) for name in TUNABLE}
+
+class HuntPolicy:
+    """
+    Walks at the nearest awake enemy and attacks once in reach, casts flame when it can.
+    Wanders along the WALK script while no enemy is awake
+    """
+    def __init__(self, reach = 90):
+
+        self.reach = reach
+        self.level = None
+        self.keys = KeyState()
+        self.wander = ScriptedKeys(WALK)
+
+    def bind(self, level):
+
+        self.level = level
+        self.tick()
+
+    def get_pressed(self):
+
+        return self.keys
+
+    def tick(self):
+        """
+        picks the keys for the next frame
+        """
+
+        player = self.level.player
+        #members only holds awake enemies, the sleeping ones wait in the group's sleep grid
+        enemies = self.level.enemy_sprites.members
+        if not enemies:
+            self.wander.tick()
+            self.keys = self.wander.get_pressed()
+            return
+
+        px, py = player.rect.center
+        target = min(enemies, key = lambda enemy: (enemy.rect.centerx - px) ** 2 + (enemy.rect.centery - py) ** 2)
+        dx = target.rect.centerx - px
+        dy = target.rect.centery - py
+
+        keys = []
+        if abs(dx) > self.reach // 2:
+            keys.append(pygame.K_RIGHT if dx > 0 else pygame.K_LEFT)
+        if abs(dy) > self.reach // 2:
+            keys.append(pygame.K_DOWN if dy > 0 else pygame.K_UP)
+        if dx * dx + dy * dy < self.reach * self.reach:
+            keys.append(pygame.K_SPACE)
+        elif player.magic == 'flame' and player.energy >= magic_data['flame']['cost'] and dx * dx + dy * dy < (self.reach * 3) ** 2:
+            keys.append(pygame.K_LCTRL)
+
+        self.keys = KeyState(keys)
+
+class ScriptPolicy(ScriptedKeys):
+    """
+    ScriptedKeys that ignores the level
+    """
+
+    def bind(self, level):
+        pass
+
+POLICIES = {
+    'idle': lambda: ScriptPolicy([(1, ())]),
+    'walk': lambda: ScriptPolicy(WALK),
+    'fight': lambda: ScriptPolicy(FIGHT),
+    'flame': lambda: ScriptPolicy(FLAME),
+    'hunt': HuntPolicy,
+}
+
+def apply_overrides(run):
+    """
+    resets the tunable tables in place and applies the overrides of one run,
+    in place so every module that imported the tables sees them
+    """
+
+    for name in TUNABLE:
+        table = getattr(settings, name)
+        table.clear()
+        table.update(deepcopy(BASE_TABLES[name]))
+        for key, changes in run.get(name, {}).items():
+            table[key].update(changes)
+
+def simulate(run):
+    """
+    plays one run in this process and returns its result record
+    """
+
+    apply_overrides(run)
+    random.seed(run.get('seed', 0))
+    frames = run.get('frames', FPS * 60)
+    sample_every = run.get('sample_every', FPS)
+
+    policy = POLICIES[run.get('policy', 'hunt')]()
+    sim = HeadlessSim(keys = policy)
+    policy.bind(sim.level)
+    player = sim.level.player
+
+    exp_curve = [player.exp]
+    start = time.perf_counter()
+    while sim.frame < frames and not sim.level.player_dead:
+        sim.step()
+        if sim.frame % sample_every == 0:
+            exp_curve.append(player.exp)
+    elapsed = time.perf_counter() - start
+    sim.close()
+
+    died = sim.level.player_dead
+    return {
+        'run': run,
+        'frames': sim.frame,
+        'died': died,
+        'death_seconds': sim.clock.get_ticks() / 1000 if died else None,
+        'final_exp': player.exp,
+        'exp_curve': exp_curve,
+        'fps': sim.frame / elapsed,
+    }
+
+def summarize(results, elapsed):
+    """
+    returns the aggregate of a batch as printable lines
+    """
+
+    deaths = [result['death_seconds'] for result in results if result['died']]
+    frames = sum(result['frames'] for result in results)
+    mean_exp = sum(result['final_exp'] for result in results) / len(results)
+
+    lines = [f'{len(results)} runs, {frames} frames in {elapsed:.2f}s, {frames / elapsed:.0f} frames per second over all workers']
+    #runs that played no frames took no run time, with none left there is no per run rate
+    run_seconds = sum(result['frames'] / result['fps'] for result in results if result['frames'])
+    if run_seconds:
+        lines.append(f'{frames / run_seconds:.0f} frames per second per run')
+    if deaths:
+        lines.append(f'{len(deaths)} deaths, mean time to death {sum(deaths) / len(deaths):.1f}s, first {min(deaths):.1f}s')
+    else:
+        lines.append('no deaths')
+    lines.append(f'mean final exp {mean_exp:.0f}')
+
+    return lines
+
+def main():
+
+    parser = argparse.ArgumentParser(description = 'parallel headless balance runs')
+    parser.add_argument('runs_file', nargs = '?', help = 'json list of runs, see the file docstring')
+    parser.add_argument('--runs', type = int, default = os.cpu_count(), help = 'seeds 0 to N-1 when no runs file is given')
+    parser.add_argument('--policy', default = 'hunt', choices = list(POLICIES))
+    parser.add_argument('--frames', type = int, default = FPS * 60)
+    parser.add_argument('--workers', type = int, default = os.cpu_count())
+    parser.add_argument('--out', help = 'json lines file the per run results are written to')
+    args = parser.parse_args()
+
+    if args.runs_file:
+        with open(args.runs_file) as runs_file:
+            runs = json.load(runs_file)
+    else:
+        runs = [{'seed': seed, 'policy': args.policy} for seed in range(args.runs)]
+    for run in runs:
+        run.setdefault('frames', args.frames)
+
+    #fresh interpreters, so no worker inherits a started pygame,
+    #workers are let to finish since SDL swallows the SIGTERM a pool terminate sends
+    start = time.perf_counter()
+    pool = get_context('spawn').Pool(args.workers)
+    try:
+        results = pool.map(simulate, runs, chunksize = 1)
+    finally:
+        pool.close()
+        pool.join()
+    elapsed = time.perf_counter() - start
+
+    print('\n'.join(summarize(results, elapsed)))
+    if args.out:
+        with open(args.out, 'w') as out_file:
+            for result in results:
+                out_file.write(json.dumps(result) + '\n')
+
+if __name__ == '__main__':
+    main()
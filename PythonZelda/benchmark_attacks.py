@@ -0,0 +1,71 @@
+"""
+Benchmark for resolving attacks against awake enemies
+Compares testing every enemy against each attack with rebuilding a SpatialGroup grid
+once per frame and testing only the enemies in the cells under each attack.
+Enemies move every frame, so the grid has to be rebuilt every frame that has an attack
+
+usage: python benchmark_attacks.py [enemy counts] [attacks per frame]
+"""
+import sys
+import time
+import pygame
+from random import Random
+from settings import *
+from spatial import SpatialGroup
+
+class Dummy(pygame.sprite.Sprite):
+    """
+    Bare sprite with the rect of a monster
+    """
+    def __init__(self, pos, groups):
+        super().__init__(groups)
+
+        self.rect = pygame.Rect(pos, (TILESIZE, TILESIZE))
+
+def wander(sprites, rng, width, height):
+
+    for sprite in sprites:
+        sprite.rect.x = (sprite.rect.x + rng.randint(-3, 3)) % width
+        sprite.rect.y = (sprite.rect.y + rng.randint(-3, 3)) % height
+
+def time_frames(enemy_count, attack_count, grid, frames = 120, seed = 0, width = 3500, height = 3000):
+    """
+    returns the mean milliseconds per frame spent finding the enemies under attack_count attacks
+    """
+
+    rng = Random(seed)
+    group = SpatialGroup(cell_size = TILESIZE * 2, box = 'rect') if grid else pygame.sprite.Group()
+    sprites = [Dummy((rng.randrange(width), rng.randrange(height)), [group]) for _ in range(enemy_count)]
+
+    elapsed = 0
+    hits = 0
+    for frame in range(frames):
+        wander(sprites, rng, width, height)
+        attacks = [pygame.Rect(rng.randrange(width), rng.randrange(height), 60, 60) for _ in range(attack_count)]
+
+        start = time.perf_counter()
+        if grid:
+            group.refresh()
+            for attack in attacks:
+                hits += len([sprite for sprite in group.near(attack) if sprite.rect.colliderect(attack)])
+        else:
+            for attack in attacks:
+                hits += len([sprite for sprite in group if sprite.rect.colliderect(attack)])
+        elapsed += time.perf_counter() - start
+
+    return elapsed * 1000 / frames, hits
+
+def main(enemy_counts = (16, 64, 172, 500), attack_counts = (1, 5, 25, 100)):
+
+    print(f'{"enemies":>8} {"attacks":>8} {"linear ms":>10} {"grid ms":>10}')
+    for enemy_count in enemy_counts:
+        for attack_count in attack_counts:
+            linear_ms, linear_hits = time_frames(enemy_count, attack_count, False)
+            grid_ms, grid_hits = time_frames(enemy_count, attack_count, True)
+            assert linear_hits == grid_hits
+            print(f'{enemy_count:>8} {attack_count:>8} {linear_ms:>10.3f} {grid_ms:>10.3f}')
+
+if __name__ == '__main__':
+    enemy_counts = tuple(int(count) for count in sys.argv[1].split(',')) if len(sys.argv) > 1 else (16, 64, 172, 500)
+    attack_counts = tuple(int(count) for count in sys.argv[2].split(',')) if len(sys.argv) > 2 else (1, 5, 25, 100)
+    main(enemy_counts, attack_counts)
@@ -0,0 +1,84 @@
+"""
+Benchmark for obstacle collision cost per frame against entity count
+Compares a plain linear scan of every obstacle with the SpatialGroup grid
+run from the folder holding map/ like the game itself
+"""
+import sys
+import time
+import pygame
+from random import Random
+from settings import *
+from support import import_csv_layout
+from tile import Tile
+from entity import Entity
+from spatial import SpatialGroup
+
+class LinearGroup(pygame.sprite.Group):
+    """
+    Sprite group answering near() with every sprite, the way collision worked before the grid
+    """
+
+    def near(self, rect):
+        return self.sprites()
+
+class Walker(Entity):
+    """
+    Bare entity that wanders in a random direction and collides with obstacles
+    """
+    def __init__(self, pos, obstacle_sprites):
+        super().__init__([])
+
+        self.rect = pygame.Rect(pos, (TILESIZE, TILESIZE))
+        self.hitbox = self.rect.inflate(0,-10)
+        self.obstacle_sprites = obstacle_sprites
+
+def build_obstacles(group):
+    """
+    fills the group with the same obstacle tiles Level.create_map builds
+    """
+
+    for path, sprite_type in (('map/map_FloorBlocks.csv', 'invisible'), ('map/map_Grass.csv', 'grass'), ('map/map_Objects.csv', 'object')):
+        for row_index, row in enumerate(import_csv_layout(path)):
+            for col_index, col in enumerate(row):
+                if col != '-1':
+                    Tile((col_index * TILESIZE, row_index * TILESIZE), [group], sprite_type)
+
+    return group
+
+def time_frames(obstacle_sprites, entity_count, frames, seed = 0):
+    """
+    returns the mean milliseconds per frame spent moving entity_count walkers
+    """
+
+    rng = Random(seed)
+    width = max(sprite.rect.right for sprite in obstacle_sprites)
+    height = max(sprite.rect.bottom for sprite in obstacle_sprites)
+    walkers = [Walker((rng.randrange(width), rng.randrange(height)), obstacle_sprites) for _ in range(entity_count)]
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        for walker in walkers:
+            if frame % 30 == 0:
+                walker.direction = pygame.math.Vector2(rng.uniform(-1,1), rng.uniform(-1,1))
+            walker.move(3)
+    elapsed = time.perf_counter() - start
+
+    return elapsed * 1000 / frames
+
+def main(counts = (1, 10, 35, 100, 350), frames = 60):
+
+    linear = build_obstacles(LinearGroup())
+    spatial = build_obstacles(SpatialGroup())
+    print(f'{len(spatial)} obstacle tiles, {frames} frames per run')
+    print(f'{"entities":>8} {"linear ms":>10} {"grid ms":>10} {"speedup":>8}')
+
+    for count in counts:
+        linear_ms = time_frames(linear, count, frames)
+        spatial_ms = time_frames(spatial, count, frames)
+        print(f'{count:>8} {linear_ms:>10.3f} {spatial_ms:>10.3f} {linear_ms / spatial_ms:>7.1f}x')
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(tuple(int(count) for count in sys.argv[1].split(',')))
+    else:
+        main()
@@ -0,0 +1,196 @@
+"""
+Benchmark suite for the whole game loop
+Boots a headless Level on a scenario map, plays a key script into it and reports
+frames per second, frame time percentiles and peak memory as one json line per scenario,
+so runs can be appended to one file and compared across commits.
+Every scenario runs in its own process so its peak memory is its own
+run from the folder holding map/ and graphics/ like the game itself
+
+usage: python benchmark_game.py [scenario ...] [--frames N] [--out results.jsonl]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tempfile
+import numpy
+from headless import HeadlessSim
+from controls import ScriptedKeys
+from mapfile import load_map_layers, write_map
+from settings import *
+import pygame
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+#key scripts, (frames, keys held) steps that loop
+WALK = [(40, (pygame.K_RIGHT,)), (40, (pygame.K_DOWN,)), (40, (pygame.K_LEFT,)), (40, (pygame.K_UP,))]
+FIGHT = [(20, (pygame.K_RIGHT, pygame.K_SPACE)), (20, (pygame.K_DOWN, pygame.K_SPACE)),
+    (20, (pygame.K_LEFT, pygame.K_SPACE)), (20, (pygame.K_UP, pygame.K_SPACE))]
+FLAME = [(10, (pygame.K_LCTRL,)), (20, (pygame.K_RIGHT, pygame.K_SPACE)), (10, (pygame.K_LCTRL,)),
+    (20, (pygame.K_DOWN, pygame.K_SPACE)), (10, (pygame.K_LCTRL,)), (20, (pygame.K_LEFT, pygame.K_SPACE)),
+    (10, (pygame.K_LCTRL,)), (20, (pygame.K_UP, pygame.K_SPACE))]
+
+def free_cells(layers):
+    """
+    returns a mask of walkable floor cells that hold nothing yet
+    """
+
+    free = (layers['FloorBlocks'] == -1) & (layers['Objects'] == -1) & (layers['Grass'] == -1) & (layers['Entities'] == -1)
+    if 'Floor' in layers:
+        free &= layers['Floor'] != -1
+
+    return free
+
+def fill_grass(layers):
+    """
+    covers every free cell of the map with grass
+    """
+
+    layers['Grass'][free_cells(layers)] = 8
+    return layers
+
+def multiply_enemies(layers, copies = 9, reach = 4):
+    """
+    puts copies more of every monster on the free cells closest to it
+    """
+
+    entities = layers['Entities']
+    free = free_cells(layers)
+    monster_ids = [monster['tile_id'] for monster in monster_data.values()]
+    rows, cols = numpy.nonzero(numpy.isin(entities, monster_ids))
+
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        around = [(abs(y) + abs(x), y, x) for y in range(-reach, reach + 1) for x in range(-reach, reach + 1)]
+        placed = 0
+        for _, y, x in sorted(around):
+            cell = (row + y, col + x)
+            if placed == copies:
+                break
+            if 0 <= cell[0] < entities.shape[0] and 0 <= cell[1] < entities.shape[1] and free[cell]:
+                entities[cell] = entities[row, col]
+                free[cell] = False
+                placed += 1
+
+    return layers
+
+def spam_flame(level, frame, every = 3):
+    """
+    casts a free flame every few frames on top of the scripted casts
+    """
+
+    if frame % every == 0:
+        level.magic_player.flame(magic_data['flame']['strength'], 0, level.player)
+
+#name: (map transform, key script, per frame hook)
+SCENARIOS = {
+    'baseline': (None, WALK, None),
+    'enemies_10x': (multiply_enemies, FIGHT, None),
+    'dense_grass': (fill_grass, WALK, None),
+    'particle_storm': (fill_grass, FLAME, spam_flame),
+}
+
+def peak_memory_mb():
+    """
+    returns the peak resident memory of this process, None where the platform can not tell
+    """
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def commit_id():
+
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd = os.path.dirname(os.path.abspath(__file__)),
+            capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_scenario(name, frames, seed = 0):
+    """
+    plays one scenario for frames frames and returns its result record
+    """
+
+    transform, script, hook = SCENARIOS[name]
+    random.seed(seed)
+    layers = {layer: grid.copy() for layer, grid in load_map_layers(MAP_SOURCE).items()}
+    if transform:
+        layers = transform(layers)
+
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors = True) as folder:
+        map_path = os.path.join(folder, f'{name}.zmap')
+        write_map(layers, map_path)
+        sim = HeadlessSim(render_every = 1, map_source = map_path, keys = ScriptedKeys(script))
+
+    level = sim.level
+    player = level.player
+    sprites = len(level.visible_sprites)
+    times = numpy.empty(frames)
+
+    for frame in range(frames):
+        #keeps the player alive and casting so every run lasts all its frames
+        player.health = player.stats['health']
+        player.energy = player.stats['energy']
+        if hook:
+            hook(level, frame)
+
+        start = time.perf_counter()
+        sim.step()
+        times[frame] = time.perf_counter() - start
+    sim.close()
+
+    p50, p95, p99 = numpy.percentile(times, (50, 95, 99)) * 1000
+    return {
+        'scenario': name,
+        'commit': commit_id(),
+        'frames': frames,
+        'fps': round(frames / times.sum(), 1),
+        'p50_ms': round(p50, 3),
+        'p95_ms': round(p95, 3),
+        'p99_ms': round(p99, 3),
+        'max_ms': round(times.max() * 1000, 3),
+        'peak_mb': peak_memory_mb(),
+        'sprites': sprites,
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+    }
+
+def main():
+
+    parser = argparse.ArgumentParser(description = 'game loop benchmarks')
+    parser.add_argument('scenarios', nargs = '*', default = list(SCENARIOS), help = ', '.join(SCENARIOS))
+    parser.add_argument('--frames', type = int, default = FPS * 10)
+    parser.add_argument('--out', help = 'json lines file the results are appended to')
+    parser.add_argument('--child', action = 'store_true', help = argparse.SUPPRESS)
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f'unknown scenario {name}, pick from {", ".join(SCENARIOS)}')
+
+    if args.child:
+        print(json.dumps(run_scenario(args.scenarios[0], args.frames)))
+        return
+
+    print(f'{"scenario":>15} {"fps":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"peak MB":>8} {"sprites":>8}')
+    for name in args.scenarios:
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), name, '--frames', str(args.frames), '--child'],
+            capture_output = True, text = True, check = True)
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+
+        peak = f'{result["peak_mb"]:.0f}' if result['peak_mb'] is not None else '-'
+        print(f'{name:>15} {result["fps"]:>8.1f} {result["p50_ms"]:>8.2f} {result["p95_ms"]:>8.2f} {result["p99_ms"]:>8.2f} {peak:>8} {result["sprites"]:>8}')
+        if args.out:
+            with open(args.out, 'a') as out_file:
+                out_file.write(json.dumps(result) + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Memory report for static tiles, bytes per tile for Tile sprites against StaticTile records
+Fills a map (500x500 by default) with boundary tiles and with object tiles sharing one surface,
+each held by the obstacle grid the way Level.create_map does
+"""
+import sys
+import tracemalloc
+import pygame
+from settings import *
+from tile import Tile, StaticTile
+from spatial import SpatialGroup
+
+def measure(tile_class, sprite_type, size, surface):
+    """
+    returns the bytes allocated per tile for a size x size map of one tile class
+    """
+
+    group = SpatialGroup()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    tiles = []
+    for row in range(size):
+        for col in range(size):
+            pos = (col * TILESIZE, row * TILESIZE)
+            if surface is None and tile_class is Tile:
+                tiles.append(Tile(pos, [group], sprite_type))
+            else:
+                tiles.append(tile_class(pos, [group], sprite_type, surface))
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return (after - before) / (size * size)
+
+def main(size = 500):
+
+    object_surf = pygame.Surface((TILESIZE, TILESIZE * 2))
+    print(f'{size}x{size} map, {size * size} tiles per run')
+    print(f'{"tile kind":>10} {"Tile B":>8} {"StaticTile B":>13} {"saved":>6}')
+
+    for sprite_type, surface in (('invisible', None), ('object', object_surf)):
+        sprite_bytes = measure(Tile, sprite_type, size, surface)
+        record_bytes = measure(StaticTile, sprite_type, size, surface)
+        print(f'{sprite_type:>10} {sprite_bytes:>8.0f} {record_bytes:>13.0f} {1 - record_bytes / sprite_bytes:>6.0%}')
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
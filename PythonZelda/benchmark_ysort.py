@@ -0,0 +1,108 @@
+"""
+Benchmark for YSortCameraGroup.custom_draw frame time
+Compares the old full sorted() draw with the chunked static tier and
+insertion sorted dynamic tier at a multiple of the map's sprite count
+run from the folder holding map/ and graphics/ like the game itself
+"""
+import os
+import sys
+import time
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+from random import Random
+from settings import *
+from support import import_csv_layout, import_folder
+from tile import Tile
+
+pygame.init()
+pygame.display.set_mode((WIDTH, HEIGHT))
+
+from level import YSortCameraGroup
+
+class LegacyYSortCameraGroup(YSortCameraGroup):
+    """
+    camera group drawing the way it did before the static and dynamic tiers
+    """
+
+    def custom_draw(self, player):
+
+        self.offset.x = player.rect.centerx - self.half_width
+        self.offset.y = player.rect.centery - self.half_height
+
+        floor_offset_pos = self.floor_rect.topleft - self.offset
+        self.display_surface.blit(self.floor_surf, floor_offset_pos)
+
+        for sprite in sorted(self.sprites(), key = lambda sprite: sprite.rect.centery):
+            offset_pos = sprite.rect.topleft - self.offset
+            self.display_surface.blit(sprite.image, offset_pos)
+
+class Mover(pygame.sprite.Sprite):
+    """
+    stand in for enemies and particles, drifts up and down a little every frame
+    """
+    def __init__(self, pos, image, groups):
+        super().__init__(groups)
+
+        self.image = image
+        self.rect = self.image.get_rect(topleft = pos)
+        self.step = 1
+
+    def update(self):
+        self.rect.y += self.step
+        self.step = -self.step
+
+def build(group_class, scale, seed = 0):
+    """
+    fills a camera group with scale times the grass and objects of the map and 35 * scale movers
+    """
+
+    rng = Random(seed)
+    group = group_class()
+    grass = import_folder('graphics/grass')
+    objects = import_folder('graphics/objects')
+    mover_image = pygame.Surface((64,64))
+    width, height = group.floor_rect.size
+
+    for _ in range(scale):
+        jitter = (rng.randrange(-TILESIZE, TILESIZE), rng.randrange(-TILESIZE, TILESIZE))
+        for path, sprite_type in (('map/map_Grass.csv', 'grass'), ('map/map_Objects.csv', 'object')):
+            for row_index, row in enumerate(import_csv_layout(path)):
+                for col_index, col in enumerate(row):
+                    if col != '-1':
+                        pos = (col_index * TILESIZE + jitter[0], row_index * TILESIZE + jitter[1])
+                        surf = rng.choice(grass) if sprite_type == 'grass' else objects[int(col)]
+                        Tile(pos, [group], sprite_type, surf)
+        for _ in range(35):
+            Mover((rng.randrange(width), rng.randrange(height)), mover_image, [group])
+
+    player = Mover((width // 2, height // 2), mover_image, [group])
+    return group, player
+
+def time_frames(group, player, frames):
+    """
+    returns the mean milliseconds per custom_draw call
+    """
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        group.update()
+        group.custom_draw(player)
+    elapsed = time.perf_counter() - start
+
+    return elapsed * 1000 / frames
+
+def main(scales = (1, 10), frames = 120):
+
+    print(f'{"scale":>5} {"sprites":>8} {"sorted ms":>10} {"tiered ms":>10}')
+    for scale in scales:
+        legacy, legacy_player = build(LegacyYSortCameraGroup, scale)
+        tiered, tiered_player = build(YSortCameraGroup, scale)
+        legacy_ms = time_frames(legacy, legacy_player, frames)
+        tiered_ms = time_frames(tiered, tiered_player, frames)
+        print(f'{scale:>5} {len(tiered):>8} {legacy_ms:>10.3f} {tiered_ms:>10.3f}')
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(tuple(int(scale) for scale in sys.argv[1].split(',')))
+    else:
+        main()
@@ -0,0 +1,16 @@
+"""
+pytest setup, tests run on SDL's dummy drivers from the folder holding graphics/ and map/ like the game itself
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pytest
+
+GAME_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture(autouse = True)
+def game_folder(monkeypatch):
+
+    monkeypatch.chdir(GAME_FOLDER)
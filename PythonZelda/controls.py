@@ -0,0 +1,64 @@
+"""
+File holds the keyboard state the player and upgrade menu read their input from
+By default that is pygame's keyboard, benchmarks and replays swap in scripted keys
+"""
+import pygame
+
+class KeyState:
+    """
+    Pressed keys that index like the sequence pygame.key.get_pressed returns
+    """
+    __slots__ = ('keys',)
+
+    def __init__(self, keys = ()):
+
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key):
+
+        return key in self.keys
+
+class ScriptedKeys:
+    """
+    Plays back a script of (frames, keys) steps, holding each set of keys for its frames.
+    The script starts over once it runs out
+    """
+    def __init__(self, script):
+
+        self.steps = [(frames, KeyState(keys)) for frames, keys in script]
+        self.index = 0
+        self.frames_left = self.steps[0][0]
+
+    def get_pressed(self):
+
+        return self.steps[self.index][1]
+
+    def tick(self):
+        """
+        moves the script on by one frame
+        """
+
+        self.frames_left -= 1
+        if self.frames_left <= 0:
+            self.index = (self.index + 1) % len(self.steps)
+            self.frames_left = self.steps[self.index][0]
+
+active_keys = None
+
+def use_keys(keys):
+    """
+    makes all input read from keys, None goes back to the real keyboard
+    """
+
+    global active_keys
+    active_keys = keys
+
+def get_pressed():
+    """
+    returns the pressed keys for this frame
+    """
+
+    if active_keys:
+        return active_keys.get_pressed()
+
+    return pygame.key.get_pressed()
@@ -4,15 +4,19 @@ for debug purpouses
 """
 import pygame
 
-pygame.init()
-
-font = pygame.font.Font(None,30)
+#made on first use, so importing this file does not start pygame
+font = None
 
 def debug(info, y = 10, x = 10):
     """
     Displays any information in the top left corner of the window
     """
 
+    global font
+    if font is None:
+        pygame.font.init()
+        font = pygame.font.Font(None,30)
+
     display_surface = pygame.display.get_surface()
     debug_surf = font.render(str(info),True,'White')
     debug_rect = debug_surf.get_rect(topleft = (x,y))
@@ -1,7 +1,10 @@
 import pygame
+import numpy
 from settings import *
 from entity import Entity
 from support import *
+from spatial import cell_range
+from timing import get_ticks
 
 class Enemy(Entity):
     def __init__(self, monster_name, pos, groups, obstacle_sprites, damage_player, trigger_death_particles, add_exp):
@@ -13,7 +16,8 @@ class Enemy(Entity):
         self.status = 'idle'
         self.image = self.animations[self.status][self.frame_index]
 
-        #movement
+        #movement, spawn_pos is the map cell the enemy came from
+        self.spawn_pos = pos
         self.rect = self.image.get_rect(topleft = pos)
         self.hitbox = self.rect.inflate(0,-10)
         self.obstacle_sprites = obstacle_sprites
@@ -44,19 +48,18 @@ class Enemy(Entity):
         self.invincibility_duration = 300
 
         #sounds
-        self.death_sound = pygame.mixer.Sound('audio/death.wav')
-        self.hit_sound = pygame.mixer.Sound('audio/hit.wav')
-        self.attack_sound = pygame.mixer.Sound(monster_info['attack_sound'])
-        self.death_sound.set_volume(0.6)
-        self.hit_sound.set_volume(0.6)
-        self.attack_sound.set_volume(0.3)
+        self.death_sound = assets.sound('audio/death.wav', 0.6)
+        self.hit_sound = assets.sound('audio/hit.wav', 0.6)
+        self.attack_sound = assets.sound(monster_info['attack_sound'], 0.3)
 
     def import_graphics(self, name):
 
         self.animations = {'idle':[], 'move':[], 'attack':[]}
+        self.flicker_animations = {}
         main = f'graphics/monsters/{name}/'
         for animation in self.animations.keys():
-            self.animations[animation] = import_folder(main + animation)
+            self.animations[animation] = assets.folder(main + animation)
+            self.flicker_animations[animation] = assets.faded(main + animation, 0)
 
     def get_player_distance_and_direction(self, player):
         
@@ -73,30 +76,6 @@ class Enemy(Entity):
 
         return (distance, direction)
 
-    def get_status(self, player):
-
-        distance = self.get_player_distance_and_direction(player)[0]
-
-
-        if distance <= self.attack_radius and self.can_attack:
-            if self.status != 'attack':
-                self.frame_index = 0
-            self.status = 'attack'
-        elif distance <= self.notice_radius:
-            self.status = 'move'
-        else:
-            self.status = 'idle'
-
-    def actions(self, player):
-
-        if self.status == 'attack':
-            self.damage_player(self.attack_damage, self.attack_type)
-            self.attack_sound.play()
-        elif self.status == 'move':
-            self.direction = self.get_player_distance_and_direction(player)[1]
-        else:
-            self.direction = pygame.math.Vector2()
-
     def animate(self):
 
         animation = self.animations[self.status]
@@ -105,22 +84,15 @@ class Enemy(Entity):
         if self.frame_index >= len(animation):
             if self.status == 'attack':
                 self.can_attack = False
-                self.attack_timer = pygame.time.get_ticks()
+                self.attack_timer = get_ticks()
             self.frame_index = 0
 
-        self.image = animation[int(self.frame_index)]
+        self.image = self.frame_image()
         self.rect = self.image.get_rect(center = self.hitbox.center)
 
-        #flicker
-        if not self.vulnerable:
-            alpha = self.wave_value()
-            self.image.set_alpha(alpha)
-        else:
-            self.image.set_alpha(255)
-
     def cooldown(self):
 
-        current_time = pygame.time.get_ticks()
+        current_time = get_ticks()
 
         if not self.can_attack:
             if current_time - self.attack_timer >= self.attack_cooldown_time:
@@ -139,7 +111,7 @@ class Enemy(Entity):
                 self.health -= player.get_full_weapon_damage()
             elif attack_type == 'magic':
                 self.health -= player.get_full_magic_damage()
-            self.hit_time = pygame.time.get_ticks()
+            self.hit_time = get_ticks()
             self.vulnerable = False
 
     def check_death(self):
@@ -162,7 +134,155 @@ class Enemy(Entity):
         self.cooldown()
         self.check_death()
 
-    def enemy_update(self, player):
-        
-        self.get_status(player)
-        self.actions(player)
\ No newline at end of file
+# enemy status codes used by EnemyGroup
+IDLE, MOVE, ATTACK = 0, 1, 2
+STATUS_NAMES = ('idle', 'move', 'attack')
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+class EnemyGroup(pygame.sprite.Group):
+    """
+    Sprite group that runs the AI of all its enemies in one batched numpy pass.
+    Radii and status codes are kept as arrays, positions are gathered once per frame
+    and the resulting status and direction are written back to each enemy.
+    Idle enemies far from the player are put to sleep: they leave every other group,
+    so they are not updated, drawn or attacked, and wait in a grid until the player comes near
+    """
+    def __init__(self, *sprites, cell_size = CHUNK_SIZE * TILESIZE):
+
+        self.members = []
+        self.dirty = True
+
+        #sleeping enemies, bucketed by the grid cell of their center
+        self.cell_size = cell_size
+        self.sleeping = {}
+        self.sleep_cells = {}
+        self.wake_reach = max(info['notice_radius'] for info in monster_data.values()) + ENEMY_WAKE_MARGIN
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        self.members.append(sprite)
+        self.dirty = True
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+
+        if sprite in self.sleep_cells:
+            self.sleeping[self.sleep_cells.pop(sprite)].remove(sprite)
+        else:
+            self.members.remove(sprite)
+            self.dirty = True
+
+    def sleep(self, enemy):
+        """
+        takes an enemy out of its other groups and parks it in the sleep grid
+        """
+
+        enemy.sleep_groups = [group for group in enemy.groups() if group is not self]
+        enemy.remove(*enemy.sleep_groups)
+
+        key = (enemy.rect.centerx // self.cell_size, enemy.rect.centery // self.cell_size)
+        self.sleeping.setdefault(key, []).append(enemy)
+        self.sleep_cells[enemy] = key
+
+    def wake_near(self, player):
+        """
+        wakes the sleeping enemies in the activation ring around the player,
+        only the grid cells within reach of the player are looked at
+        """
+
+        reach = self.wake_reach
+        player_x, player_y = player.rect.center
+        area = pygame.Rect(player_x - reach, player_y - reach, reach * 2, reach * 2)
+
+        for key in cell_range(area, self.cell_size):
+            bucket = self.sleeping.get(key)
+            if not bucket:
+                continue
+            for enemy in bucket[:]:
+                wake_radius = enemy.notice_radius + ENEMY_WAKE_MARGIN
+                if (enemy.rect.centerx - player_x) ** 2 + (enemy.rect.centery - player_y) ** 2 <= wake_radius ** 2:
+                    bucket.remove(enemy)
+                    del self.sleep_cells[enemy]
+                    enemy.add(*enemy.sleep_groups)
+                    self.members.append(enemy)
+                    self.dirty = True
+
+    def wake_all(self):
+        """
+        puts every sleeping enemy back into its groups, they fall asleep again on the next update
+        """
+
+        for bucket in self.sleeping.values():
+            for enemy in bucket:
+                enemy.add(*enemy.sleep_groups)
+                self.members.append(enemy)
+        self.sleeping.clear()
+        self.sleep_cells.clear()
+        self.dirty = True
+
+    def rebuild(self):
+        """
+        rebuilds the per enemy arrays after enemies were added or removed
+        """
+
+        self.attack_radius = numpy.array([enemy.attack_radius for enemy in self.members], dtype = float)
+        self.notice_radius = numpy.array([enemy.notice_radius for enemy in self.members], dtype = float)
+        self.status = numpy.array([STATUS_CODES[enemy.status] for enemy in self.members], dtype = numpy.int8)
+        self.sleep_radius = self.notice_radius + ENEMY_SLEEP_MARGIN
+        self.dirty = False
+
+    def update_ai(self, player):
+        """
+        picks status and direction for every enemy against the player and acts on it
+        """
+
+        self.wake_near(player)
+
+        enemies = self.members
+        if not enemies:
+            return
+        if self.dirty:
+            self.rebuild()
+
+        #gather what changes every frame
+        state = numpy.array([(enemy.rect.centerx, enemy.rect.centery, enemy.can_attack, bool(enemy.direction), enemy.vulnerable) for enemy in enemies], dtype = float)
+        delta = numpy.array(player.rect.center, dtype = float) - state[:, :2]
+        distance = numpy.hypot(delta[:, 0], delta[:, 1])
+
+        #status transitions
+        attack = (distance <= self.attack_radius) & (state[:, 2] != 0)
+        move = ~attack & (distance <= self.notice_radius)
+        status = numpy.where(attack, ATTACK, numpy.where(move, MOVE, IDLE)).astype(numpy.int8)
+
+        for index in numpy.flatnonzero(status != self.status).tolist():
+            enemy = enemies[index]
+            if status[index] == ATTACK:
+                enemy.frame_index = 0
+            enemy.status = STATUS_NAMES[status[index]]
+        self.status = status
+
+        #normalized directions towards the player
+        safe_distance = numpy.where(distance == 0, 1, distance)
+        direction = delta / safe_distance[:, None]
+
+        #actions
+        for index in numpy.flatnonzero(attack).tolist():
+            enemy = enemies[index]
+            enemy.damage_player(enemy.attack_damage, enemy.attack_type)
+            enemy.attack_sound.play()
+
+        moving = numpy.flatnonzero(move)
+        for index, (x, y) in zip(moving.tolist(), direction[moving].tolist()):
+            enemies[index].direction = pygame.math.Vector2(x, y)
+
+        for index in numpy.flatnonzero(~attack & ~move & (state[:, 3] != 0)).tolist():
+            enemies[index].direction = pygame.math.Vector2()
+
+        #idle enemies with no running hit timer fall asleep once far enough away
+        asleep = (status == IDLE) & (distance > self.sleep_radius) & (state[:, 4] != 0)
+        if asleep.any():
+            for index in numpy.flatnonzero(asleep).tolist():
+                self.sleep(enemies[index])
+            self.members = [enemy for enemy, sleeping in zip(enemies, asleep.tolist()) if not sleeping]
+            self.dirty = True
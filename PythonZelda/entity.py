@@ -1,7 +1,13 @@
 import pygame
 from math import sin
+from timing import get_ticks
 
 class Entity(pygame.sprite.Sprite):
+
+    #flicker state shared by every entity, worked out once per tick
+    wave_ticks = None
+    wave_alpha = 255
+
     def __init__(self, groups):
         super().__init__(groups)
 
@@ -23,7 +29,7 @@ class Entity(pygame.sprite.Sprite):
 
     def collision(self,direction):
         if direction == 'horizontal':
-            for sprite in self.obstacle_sprites:
+            for sprite in self.obstacle_sprites.near(self.hitbox):
                 if sprite.hitbox.colliderect(self.hitbox):
                     if self.direction.x > 0: # moving left
                         self.hitbox.right = sprite.hitbox.left
@@ -31,7 +37,7 @@ class Entity(pygame.sprite.Sprite):
                         self.hitbox.left = sprite.hitbox.right
         
         if direction == 'vertical':
-            for sprite in self.obstacle_sprites:
+            for sprite in self.obstacle_sprites.near(self.hitbox):
                 if sprite.hitbox.colliderect(self.hitbox):
                     if self.direction.y > 0: # moving down
                         self.hitbox.bottom = sprite.hitbox.top
@@ -40,8 +46,20 @@ class Entity(pygame.sprite.Sprite):
 
     def wave_value(self):
 
-        value = sin(pygame.time.get_ticks())
-        if value >= 0:
-            return 255
-        else:
-            return 0
+        ticks = get_ticks()
+        if ticks != Entity.wave_ticks:
+            Entity.wave_ticks = ticks
+            Entity.wave_alpha = 255 if sin(ticks) >= 0 else 0
+
+        return Entity.wave_alpha
+
+    def frame_image(self):
+        """
+        returns the current animation frame, the flicker variant while the entity is not vulnerable
+        """
+
+        index = int(self.frame_index)
+        if not self.vulnerable and self.wave_value() != 255:
+            return self.flicker_animations[self.status][index]
+
+        return self.animations[self.status][index]
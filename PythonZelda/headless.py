@@ -0,0 +1,87 @@
+"""
+File runs a Level without a window on a fixed logical timestep
+Every timer reads the SimClock, so a run goes as fast as the cpu allows
+and behaves the same no matter how long a real frame took
+
+usage: python headless.py [frames]
+"""
+import os
+import sys
+import time
+
+# SDL reads these when pygame starts in init_headless, nothing before that starts it
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from settings import *
+from timing import SimClock, use_clock
+from controls import use_keys
+from level import Level
+
+def init_headless():
+    """
+    starts pygame on the dummy drivers and returns the off screen display surface
+    """
+
+    pygame.init()
+    return pygame.display.set_mode((WIDTH, HEIGHT))
+
+class HeadlessSim:
+    """
+    Steps a Level on a fixed timestep, drawing only every render_every frames (never when 0).
+    keys is an optional input source like ScriptedKeys, ticked once per frame,
+    clock replaces the SimClock when given
+    """
+    def __init__(self, step = 1000 / FPS, render_every = 0, map_source = MAP_SOURCE, keys = None, clock = None):
+
+        self.display_surface = init_headless()
+        self.clock = clock or SimClock(step)
+        use_clock(self.clock)
+        self.keys = keys
+        use_keys(keys)
+
+        self.level = Level(map_source)
+        self.render_every = render_every
+        self.frame = 0
+
+    def step(self):
+        """
+        advances the level and the clock by one frame
+        """
+
+        if self.render_every and self.frame % self.render_every == 0:
+            self.display_surface.fill(WATER_COLOR)
+            self.level.draw()
+
+        self.level.update()
+        self.clock.tick()
+        if self.keys:
+            self.keys.tick()
+        self.frame += 1
+
+    def close(self):
+
+        self.level.close()
+
+    def run(self, frames):
+        """
+        steps until frames have run or the player dies, returns how many frames ran
+        """
+
+        start = self.frame
+        while self.frame - start < frames and not self.level.player_dead:
+            self.step()
+
+        return self.frame - start
+
+if __name__ == '__main__':
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else FPS * 60
+
+    sim = HeadlessSim()
+    start = time.perf_counter()
+    ran = sim.run(frames)
+    elapsed = time.perf_counter() - start
+
+    sim_seconds = sim.clock.get_ticks() / 1000
+    print(f'{ran} frames, {sim_seconds:.1f}s of game time in {elapsed:.2f}s ({sim_seconds / elapsed:.0f}x real time)')
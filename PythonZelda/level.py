@@ -1,23 +1,32 @@
 import pygame
 from settings import *
-from tile import Tile
+from timing import get_ticks
+from tile import Tile, StaticTile
 from player import Player
 from debug import debug
 from support import *
 from random import choice, randint
-from weapon import Weapon
+from bisect import bisect_right, insort
+from math import inf
+from functools import partial
+import numpy
+from weapon import Weapon, build_weapon_atlas
 from ui import Ui
-from enemy import Enemy
+from enemy import Enemy, EnemyGroup
 from particles import AnimationPlayer
 from magic import MagicPlayer
 from upgrade import Upgrade
+from spatial import SpatialGroup, cell_range
+from mapfile import load_map_layers, MappedLayers
+from streaming import ChunkStreamer
+from profiler import FrameProfiler
 
 class Level:
     """
     Class controls the map, and spawn locations
     Class also serves as secondary game loop calling almost all other classes
     """
-    def __init__(self):
+    def __init__(self, map_source = MAP_SOURCE):
 
         #get the display surface
         self.display_surface = pygame.display.get_surface()
@@ -25,15 +34,22 @@ class Level:
 
         #sprite group setup
         self.visible_sprites = YSortCameraGroup()
-        self.obstacle_sprites = pygame.sprite.Group()
+        self.obstacle_sprites = SpatialGroup()
 
-        #attack sprite
+        #attack sprite, finished weapons are pooled and reused
         self.current_attack = None
+        self.weapon_atlas = build_weapon_atlas()
+        self.weapon_pool = []
         self.attack_sprites = pygame.sprite.Group()
-        self.attackable_sprites = pygame.sprite.Group()
+        self.attackable_sprites = SpatialGroup(cell_size = TILESIZE * 2, box = 'rect')
+        self.grass_sprites = SpatialGroup(box = 'rect')
+        self.enemy_sprites = EnemyGroup()
 
         #sprite setup
-        self.create_map()
+        self.map_source = map_source
+        self.grass_types = {}
+        self.grass_slots = {}
+        self.create_map(map_source)
 
         #user interface
         self.ui = Ui()
@@ -46,81 +62,153 @@ class Level:
         #player death
         self.player_dead = False
 
+        #frame timing overlay and trace
+        self.profiler = FrameProfiler()
+
+        #screen rects that changed in the last draw, None when the whole screen did
+        self.dirty_rects = None
+        self.last_particle_rects = []
+        self.was_covered = False
+
     #loads the sprites onto the map
-    def create_map(self):
+    def create_map(self, map_source):
 
-        # loads all map files for spawn locations and ground
+        # loads the map layers spawns come from as integer grids,
+        # either from the csv folder or a compiled map file, whose grids stay memory mapped
+        layers = load_map_layers(map_source, ('FloorBlocks', 'Grass', 'Objects', 'Entities'))
+        self.map_layers = layers
         layouts = {
-            'boundary': import_csv_layout('map/map_FloorBlocks.csv'),
-            'grass': import_csv_layout('map/map_Grass.csv'),
-            'object': import_csv_layout('map/map_Objects.csv'),
-            'entities': import_csv_layout('map/map_Entities.csv')
+            'boundary': layers['FloorBlocks'],
+            'grass': layers['Grass'],
+            'object': layers['Objects'],
+            'entities': layers['Entities']
         }
+        self.layouts = layouts
 
         # loads images for grass and stationary objects
-        graphics = {
-            'grass': import_folder('graphics/grass'),
-            'objects': import_folder('graphics/objects'),
+        self.graphics = {
+            'grass': assets.folder('graphics/grass'),
+            'objects': assets.folder('graphics/objects'),
         }
-        
-        # loops go through each square in each map table
-        # and spawn in the apropriate tile or entity
-        for style,layout in layouts.items():
-            for row_index, row in enumerate(layout):
-                for col_index, col in enumerate(row):
-                    if col != '-1':
-                        x = col_index * TILESIZE
-                        y = row_index * TILESIZE
-
-                        # creates boundary around areas the player can not cross
-                        if style == 'boundary':
-                            Tile((x,y),[self.obstacle_sprites],'invisible')
-
-                        # spawns cuttable grass
-                        if style == 'grass':
-                            grass_type = choice(graphics['grass'])
-                            Tile(
-                                (x,y),
-                                [self.visible_sprites,self.obstacle_sprites, self.attackable_sprites],
-                                'grass',
-                                grass_type)
-
-                        # spawns non interactable objects 
-                        if style == 'object':
-                            object_surf = graphics['objects'][int(col)]
-                            Tile((x,y),[self.visible_sprites,self.obstacle_sprites],'object', object_surf)
-                        
-                        # spawns the player and enemies
-                        if style == 'entities':
-                            if col == '394':
-                                self.player = Player(
-                                    (x,y),
-                                    [self.visible_sprites], 
-                                    self.obstacle_sprites, 
-                                    self.create_attack, 
-                                    self.destroy_attack, 
-                                    self.create_magic)
-
-                            else:
-                                if col == '390': monster_name = 'bamboo'
-                                elif col == '391': monster_name = 'spirit'
-                                elif col == '392': monster_name = 'raccoon'
-                                if col == '393': monster_name = 'squid'
-                                Enemy(
-                                    monster_name, 
-                                    (x,y), 
-                                    [self.visible_sprites, self.attackable_sprites], 
-                                    self.obstacle_sprites,
-                                    self.damage_player,
-                                    self.trigger_death_particles,
-                                    self.add_exp)
-        
+
+        # each layer has its own spawner, entities are looked up by tile id
+        spawners = {
+            'boundary': self.spawn_boundary,
+            'grass': self.spawn_grass,
+            'object': self.spawn_object,
+            'entities': self.spawn_entity
+        }
+        self.entity_spawners = self.create_entity_spawners()
+
+        if STREAM_WORLD:
+            # only the player is placed up front, everything else streams in around it
+            self.streamer = ChunkStreamer(layouts, spawners)
+            row, col = self.streamer.find('entities', PLAYER_TILE_ID)
+            self.spawn_player((col * TILESIZE, row * TILESIZE))
+            del self.entity_spawners[PLAYER_TILE_ID]
+
+            self.streamer.update(self.player.rect.center, wait = True)
+        else:
+            self.streamer = None
+
+            # only the non empty cells of each layer are visited
+            for style,layout in layouts.items():
+                spawn = spawners[style]
+                rows, cols = numpy.nonzero(layout != -1)
+                for row_index, col_index, tile_id in zip(rows.tolist(), cols.tolist(), layout[rows, cols].tolist()):
+                    spawn((col_index * TILESIZE, row_index * TILESIZE), tile_id)
+
+    def create_entity_spawners(self):
+        """
+        maps entity tile ids to spawn functions, monsters are read straight from monster_data
+        """
+
+        entity_spawners = {PLAYER_TILE_ID: self.spawn_player}
+        for monster_name, monster_info in monster_data.items():
+            entity_spawners[monster_info['tile_id']] = partial(self.spawn_enemy, monster_name)
+
+        return entity_spawners
+
+    def spawn_boundary(self, pos, tile_id):
+        """
+        creates boundary around areas the player can not cross
+        """
+
+        return StaticTile(pos,[self.obstacle_sprites],'invisible')
+
+    def spawn_grass(self, pos, tile_id):
+        """
+        spawns cuttable grass
+        """
+
+        #each cell keeps the image it was first given, regrown grass draws nothing from the rng
+        grass_type = self.grass_types.get(pos)
+        if grass_type is None:
+            grass_type = self.grass_types[pos] = choice(self.graphics['grass'])
+        grass = Tile(
+            pos,
+            [self.visible_sprites,self.obstacle_sprites, self.grass_sprites],
+            'grass',
+            grass_type)
+
+        #and its place in the grids, near hands sprites out in that order so regrown grass is hit
+        #in the same order as on a freshly built level
+        slots = self.grass_slots.setdefault(pos, (self.obstacle_sprites.order[grass], self.grass_sprites.order[grass]))
+        self.obstacle_sprites.order[grass], self.grass_sprites.order[grass] = slots
+
+        return grass
+
+    def spawn_object(self, pos, tile_id):
+        """
+        spawns non interactable objects
+        """
+
+        object_surf = self.graphics['objects'][tile_id]
+        return StaticTile(pos,[self.visible_sprites,self.obstacle_sprites],'object', object_surf)
+
+    def spawn_entity(self, pos, tile_id):
+        """
+        spawns the player or an enemy, unknown tile ids are skipped
+        """
+
+        spawner = self.entity_spawners.get(tile_id)
+        if spawner:
+            return spawner(pos)
+
+    def spawn_player(self, pos):
+
+        self.player = Player(
+            pos,
+            [self.visible_sprites], 
+            self.obstacle_sprites, 
+            self.create_attack, 
+            self.destroy_attack, 
+            self.create_magic)
+
+        return self.player
+
+    def spawn_enemy(self, monster_name, pos):
+
+        return Enemy(
+            monster_name, 
+            pos, 
+            [self.visible_sprites, self.attackable_sprites, self.enemy_sprites], 
+            self.obstacle_sprites,
+            self.damage_player,
+            self.trigger_death_particles,
+            self.add_exp)
+
     def create_attack(self):
         """
         Creates an attack from the players current weapon
         """
         
-        self.current_attack = Weapon(self.player, [self.visible_sprites, self.attack_sprites])
+        if self.weapon_pool:
+            self.current_attack = self.weapon_pool.pop()
+            self.current_attack.place(self.player)
+            self.current_attack.add(self.visible_sprites, self.attack_sprites)
+        else:
+            self.current_attack = Weapon(self.player, [self.visible_sprites, self.attack_sprites], self.weapon_atlas)
 
     def create_magic(self, style, strength, cost):
         """
@@ -128,10 +216,10 @@ class Level:
         """
         
         if style == 'heal':
-            self.magic_player.heal(strength, cost, self.player, [self.visible_sprites])
+            self.magic_player.heal(strength, cost, self.player)
 
         if style == 'flame':
-            self.magic_player.flame(strength, cost, self.player, [self.visible_sprites, self.attack_sprites])
+            self.magic_player.flame(strength, cost, self.player)
 
     def destroy_attack(self):
         """
@@ -140,6 +228,7 @@ class Level:
 
         if self.current_attack:
             self.current_attack.kill()
+            self.weapon_pool.append(self.current_attack)
         self.current_attack = None
 
     def player_attack_logic(self):
@@ -147,19 +236,38 @@ class Level:
         makes sure enemies are damaged and grass is cut by attacks
         """
 
-        if self.attack_sprites:
-            for attack_sprite in self.attack_sprites:
-                collision_sprites = pygame.sprite.spritecollide(attack_sprite, self.attackable_sprites, False)
-                if collision_sprites:
-                    for target_sprite in collision_sprites:
-                        if target_sprite.sprite_type == 'grass':
-                            pos = target_sprite.rect.center
-                            offset = pygame.math.Vector2(0,75)
-                            for leaf in range(randint(3,6)):
-                                self.animation_player.create_grass_particles(pos - offset, [self.visible_sprites])
-                            target_sprite.kill()
-                        elif target_sprite.sprite_type == 'enemy':
-                            target_sprite.get_damage(self.player, attack_sprite.sprite_type)
+        #flame particles hurt like magic
+        attacks = [(attack_sprite.rect, attack_sprite.sprite_type) for attack_sprite in self.attack_sprites]
+        attacks += [(attack_rect, 'magic') for attack_rect in self.animation_player.particles.attack_rects()]
+
+        #enemies move every frame, so their grid is only worth rebuilding when many attacks share it,
+        #otherwise every awake enemy is tested, both hand out enemies in the order they were added
+        use_grid = len(attacks) >= ATTACK_GRID_MIN
+        if use_grid:
+            self.attackable_sprites.refresh()
+        for attack_rect, attack_type in attacks:
+            enemies = self.attackable_sprites.near(attack_rect) if use_grid else self.attackable_sprites
+            self.resolve_attack(attack_rect, attack_type, enemies)
+
+    def resolve_attack(self, attack_rect, attack_type, enemies):
+        """
+        cuts the grass and damages the enemies under one attack, enemies are the candidates to test
+        """
+
+        #grass only comes from the grid cells the attack covers
+        collision_sprites = [grass for grass in self.grass_sprites.near(attack_rect) if grass.rect.colliderect(attack_rect)]
+        collision_sprites += [enemy for enemy in enemies if enemy.rect.colliderect(attack_rect)]
+
+        for target_sprite in collision_sprites:
+            if target_sprite.sprite_type == 'grass':
+                pos = target_sprite.rect.center
+                offset = pygame.math.Vector2(0,75)
+                for leaf in range(randint(3,6)):
+                    self.animation_player.create_grass_particles(pos - offset)
+                #kill also drops the grass from the obstacle and grass grids
+                target_sprite.kill()
+            elif target_sprite.sprite_type == 'enemy':
+                target_sprite.get_damage(self.player, attack_type)
 
     def damage_player(self, amount, attack_type):
         """
@@ -169,8 +277,8 @@ class Level:
         if self.player.vulnerable:
             self.player.health -= amount
             self.player.vulnerable = False
-            self.player.hurt_time = pygame.time.get_ticks()
-            self.animation_player.create_particles(attack_type, self.player.rect.center, [self.visible_sprites])
+            self.player.hurt_time = get_ticks()
+            self.animation_player.create_particles(attack_type, self.player.rect.center)
 
         if self.player.health < 0:
             self.player_dead = True
@@ -180,7 +288,7 @@ class Level:
         causes short animations upond death of enemies or player
         """
 
-        self.animation_player.create_particles(particle_type, pos, [self.visible_sprites])
+        self.animation_player.create_particles(particle_type, pos)
 
     def add_exp(self, amount):
         """
@@ -189,6 +297,22 @@ class Level:
 
         self.player.exp += amount
 
+    def close(self):
+        """
+        stops the chunk reader, unmaps a compiled map and ends the profiler trace,
+        call it when the level is thrown away
+        """
+
+        if self.streamer:
+            self.streamer.stop()
+
+        #the layouts view the mapped grids, the streamer shares them, so they go before the map
+        self.layouts.clear()
+        if isinstance(self.map_layers, MappedLayers):
+            self.map_layers.close()
+
+        self.profiler.close()
+
     def toggle_menu(self):
         """
         Allows player to pause via an upgrade menu
@@ -196,23 +320,75 @@ class Level:
 
         self.game_paused = not self.game_paused
 
-    def run(self):
+    def draw(self):
         """
-        updates level and calls other functions in proper order
+        draws the world, the ui and the upgrade menu when paused
         """
 
+        profiler = self.profiler
+        profiler.start()
         self.visible_sprites.custom_draw(self.player)
-        self.ui.display(self.player)
+        profiler.mark('custom_draw')
+        particle_rects = self.animation_player.particles.draw(self.display_surface, self.visible_sprites.offset, self.visible_sprites.camera_rect)
+        profiler.mark('particles.draw')
+        hud_rects = self.ui.display(self.player)
+        profiler.mark('ui.display')
 
         if self.game_paused and not self.player_dead:
             self.upgrade.display()
+            profiler.mark('upgrade.display')
+
+        if profiler.overlay:
+            profiler.draw()
+
+        #the menu and overlay may cover anything, a moved camera changes all of the screen
+        world_rects = self.visible_sprites.dirty_rects
+        covered = self.game_paused or profiler.overlay
+        if world_rects is not None and not covered and not self.was_covered:
+            self.dirty_rects = world_rects + self.last_particle_rects + particle_rects + hud_rects
+        else:
+            self.dirty_rects = None
+        self.last_particle_rects = particle_rects
+        self.was_covered = covered
+
+    def update(self):
+        """
+        advances the game by one frame without drawing anything
+        """
+
+        profiler = self.profiler
+        profiler.start()
+        if self.streamer:
+            self.streamer.update(self.player.rect.center)
+            profiler.mark('streamer')
+
+        if self.game_paused and not self.player_dead:
+            self.upgrade.update()
+            profiler.mark('upgrade.update')
         else:
             self.visible_sprites.update()
-            self.visible_sprites.enemy_update(self.player)
+            profiler.mark('visible_sprites.update')
+            self.animation_player.particles.update()
+            profiler.mark('particles.update')
+            self.enemy_sprites.update_ai(self.player)
+            profiler.mark('enemy_ai')
             self.player_attack_logic()
-        
+            profiler.mark('player_attack_logic')
+
             #debug(self.player.status)
 
+        if profiler.enabled:
+            profiler.end_frame(len(self.visible_sprites), self.obstacle_sprites.candidates)
+            self.obstacle_sprites.candidates = 0
+
+    def run(self):
+        """
+        updates level and calls other functions in proper order
+        """
+
+        self.draw()
+        self.update()
+
 # to help control the camera
 class YSortCameraGroup(pygame.sprite.Group):
     def __init__(self):
@@ -223,11 +399,175 @@ class YSortCameraGroup(pygame.sprite.Group):
         self.half_width = self.display_surface.get_size()[0] // 2
         self.half_height = self.display_surface.get_size()[1] // 2
         self.offset = pygame.math.Vector2()
+        self.camera_rect = pygame.Rect((0,0), self.display_surface.get_size())
 
         #creating the floor
-        self.floor_surf = pygame.image.load('graphics/tilemap/ground.png').convert()
+        self.floor_surf = assets.image('graphics/tilemap/ground.png', alpha = False)
         self.floor_rect = self.floor_surf.get_rect(topleft = (0,0))
 
+        #static world layer, tiles are bucketed by chunk so only on screen chunks are drawn
+        self.chunk_px = CHUNK_SIZE * TILESIZE
+        self.chunk_surfs = {}
+        self.baked_chunks = {}
+        self.baked_keys = {}
+
+        #static draw tier, each tile lives in the chunk holding its center as a
+        #(centery, add order, sprite) entry and chunk lists are kept sorted
+        self.static_chunks = {}
+        self.static_entries = {}
+        self.static_reach = (0,0)
+        self.static_count = 0
+
+        #dynamic draw tier, kept in last frame's draw order
+        self.dynamic_order = []
+
+        #dirty rect tracking, screen rects that changed this frame, None when all of it did
+        self.track_dirty = DIRTY_RECTS
+        self.dirty_rects = None
+        self.last_camera = None
+        self.last_rects = []
+        self.removed_rects = []
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+
+        if isinstance(sprite, Tile):
+            if BAKE_STATIC_LAYERS and sprite.sprite_type == 'grass':
+                keys = cell_range(sprite.rect, self.chunk_px)
+                for key in keys:
+                    self.baked_chunks.setdefault(key, []).append(sprite)
+                    self.chunk_surfs.pop(key, None)
+                self.baked_keys[sprite] = keys
+            else:
+                self.add_static(sprite)
+        else:
+            self.dynamic_order.append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+
+        if self.track_dirty and sprite.rect.colliderect(self.camera_rect):
+            self.removed_rects.append(sprite.rect.copy())
+
+        if sprite in self.static_entries:
+            self.remove_static(sprite)
+        elif sprite in self.baked_keys:
+            for key in self.baked_keys.pop(sprite):
+                self.baked_chunks[key].remove(sprite)
+
+                #cut grass has to disappear from the baked chunk
+                self.chunk_surfs.pop(key, None)
+        else:
+            self.dynamic_order.remove(sprite)
+
+    def add_static(self, tile):
+        """
+        puts a tile sprite or StaticTile record into the static draw tier
+        """
+
+        key = (tile.rect.centerx // self.chunk_px, tile.rect.centery // self.chunk_px)
+        entry = (tile.rect.centery, self.static_count, tile)
+        self.static_count += 1
+        insort(self.static_chunks.setdefault(key, []), entry)
+        self.static_entries[tile] = (key, entry)
+
+        #how far a tile can reach out of its chunk
+        self.static_reach = (
+            max(self.static_reach[0], tile.rect.width // 2 + 1),
+            max(self.static_reach[1], tile.rect.height // 2 + 1))
+
+    def remove_static(self, tile):
+
+        key, entry = self.static_entries.pop(tile)
+        self.static_chunks[key].remove(entry)
+
+    def sort_dynamic(self):
+        """
+        insertion sorts the dynamic tier by centery, close to linear as it barely changes between frames
+        """
+
+        order = self.dynamic_order
+        keys = [sprite.rect.centery for sprite in order]
+        for index in range(1, len(order)):
+            key = keys[index]
+            if keys[index - 1] <= key:
+                continue
+            sprite = order[index]
+            position = index - 1
+            while position >= 0 and keys[position] > key:
+                keys[position + 1] = keys[position]
+                order[position + 1] = order[position]
+                position -= 1
+            keys[position + 1] = key
+            order[position + 1] = sprite
+
+        return keys
+
+    def visible_static(self):
+        """
+        returns the static entries on screen sorted by centery
+        """
+
+        camera_rect = self.camera_rect
+        search_rect = camera_rect.inflate(self.static_reach[0] * 2, self.static_reach[1] * 2)
+        visible = []
+        for key in cell_range(search_rect, self.chunk_px):
+            for entry in self.static_chunks.get(key, ()):
+                if entry[2].rect.colliderect(camera_rect):
+                    visible.append(entry)
+
+        #chunk lists are sorted runs so this is a merge
+        visible.sort()
+        return visible
+
+    def draw_order(self):
+        """
+        returns the on screen sprites by centery, the dynamic tier merged into the sorted static tier
+        """
+
+        static = self.visible_static()
+        dynamic_keys = self.sort_dynamic()
+        draw_list = []
+        start = 0
+        for sprite, key in zip(self.dynamic_order, dynamic_keys):
+            if not sprite.rect.colliderect(self.camera_rect):
+                continue
+            end = bisect_right(static, (key, inf), start)
+            draw_list.extend(entry[2] for entry in static[start:end])
+            draw_list.append(sprite)
+            start = end
+        draw_list.extend(entry[2] for entry in static[start:])
+
+        return draw_list
+
+    def bake_chunk(self, key):
+        """
+        renders the floor and baked tiles under one chunk into a cached surface
+        """
+
+        chunk_x = key[0] * self.chunk_px
+        chunk_y = key[1] * self.chunk_px
+
+        chunk_surf = pygame.Surface((self.chunk_px, self.chunk_px)).convert()
+        chunk_surf.fill(WATER_COLOR)
+        chunk_surf.blit(self.floor_surf, (self.floor_rect.x - chunk_x, self.floor_rect.y - chunk_y))
+        for sprite in sorted(self.baked_chunks.get(key, ()), key = lambda sprite: sprite.rect.centery):
+            chunk_surf.blit(sprite.image, (sprite.rect.x - chunk_x, sprite.rect.y - chunk_y))
+
+        self.chunk_surfs[key] = chunk_surf
+        return chunk_surf
+
+    def drop_far_chunks(self):
+        """
+        frees the baked surfaces of chunks further off screen than BAKE_KEEP_CHUNKS,
+        so memory follows the screen and not the area explored
+        """
+
+        margin = BAKE_KEEP_CHUNKS * self.chunk_px
+        keep = set(cell_range(self.camera_rect.inflate(margin * 2, margin * 2), self.chunk_px))
+        for key in [key for key in self.chunk_surfs if key not in keep]:
+            del self.chunk_surfs[key]
+
     def custom_draw(self, player):
         """
         moves the camera via offsets and draws the floor
@@ -236,22 +576,45 @@ class YSortCameraGroup(pygame.sprite.Group):
         #getting offset
         self.offset.x = player.rect.centerx - self.half_width
         self.offset.y = player.rect.centery - self.half_height
+        self.camera_rect.topleft = (int(self.offset.x), int(self.offset.y))
+        chunk_keys = cell_range(self.camera_rect, self.chunk_px)
 
         #draw the floor
-        floor_offset_pos = self.floor_rect.topleft - self.offset
-        self.display_surface.blit(self.floor_surf, floor_offset_pos)
+        if BAKE_STATIC_LAYERS:
+            for key in chunk_keys:
+                chunk_surf = self.chunk_surfs.get(key)
+                if not chunk_surf:
+                    chunk_rect = pygame.Rect(key[0] * self.chunk_px, key[1] * self.chunk_px, self.chunk_px, self.chunk_px)
+                    if key not in self.baked_chunks and not chunk_rect.colliderect(self.floor_rect):
+                        continue
+                    chunk_surf = self.bake_chunk(key)
+                chunk_offset_pos = (key[0] * self.chunk_px - self.offset.x, key[1] * self.chunk_px - self.offset.y)
+                self.display_surface.blit(chunk_surf, chunk_offset_pos)
+            self.drop_far_chunks()
+        else:
+            floor_offset_pos = self.floor_rect.topleft - self.offset
+            self.display_surface.blit(self.floor_surf, floor_offset_pos)
 
-        #for sprite in self.sprites():
-        for sprite in sorted(self.sprites(), key = lambda sprite: sprite.rect.centery):
-            offset_pos = sprite.rect.topleft - self.offset
-            self.display_surface.blit(sprite.image, offset_pos)
+        offset = self.offset
+        self.display_surface.blits([(sprite.image, sprite.rect.topleft - offset) for sprite in self.draw_order()], False)
 
-    def enemy_update(self, player):
+        if self.track_dirty:
+            self.track_changes([sprite for sprite in self.dynamic_order if sprite.rect.colliderect(self.camera_rect)])
+
+    def track_changes(self, dynamic):
         """
-        updates enemies
+        works out the screen rects that differ from last frame, the old and new rects
+        of moving sprites and the rects of removed ones, everything once the camera moved
         """
 
-        enemy_sprites = [sprite for sprite in self.sprites() if hasattr(sprite, 'sprite_type') and sprite.sprite_type == 'enemy']
+        offset_x, offset_y = self.camera_rect.topleft
+        rects = [sprite.rect.move(-offset_x, -offset_y) for sprite in dynamic]
+
+        if self.camera_rect.topleft != self.last_camera:
+            self.dirty_rects = None
+        else:
+            self.dirty_rects = self.last_rects + rects + [rect.move(-offset_x, -offset_y) for rect in self.removed_rects]
 
-        for enemy in enemy_sprites:
-            enemy.enemy_update(player)
\ No newline at end of file
+        self.last_camera = self.camera_rect.topleft
+        self.last_rects = rects
+        self.removed_rects = []
@@ -1,17 +1,18 @@
 import pygame
 from settings import *
 from random import randint
+from support import assets
 
 class MagicPlayer:
     def __init__(self, animation_player):
         self.animation_player = animation_player
         self.sounds = {
-            'heal': pygame.mixer.Sound('audio/heal.wav'),
-            'flame': pygame.mixer.Sound('audio/fire.wav')
+            'heal': assets.sound('audio/heal.wav'),
+            'flame': assets.sound('audio/Fire.wav')
         }
 
 
-    def heal(self, strength, cost, player, groups):
+    def heal(self, strength, cost, player):
 
         if player.energy >= cost and player.health < player.stats['health']:
             self.sounds['heal'].play()
@@ -19,10 +20,10 @@ class MagicPlayer:
             player.energy -= cost
             if player.health > player.stats['health']:
                 player.health = player.stats['health']
-            self.animation_player.create_particles('aura', player.rect.center, groups)
-            self.animation_player.create_particles('heal', player.rect.center + pygame.math.Vector2(0, -60), groups)
+            self.animation_player.create_particles('aura', player.rect.center)
+            self.animation_player.create_particles('heal', player.rect.center + pygame.math.Vector2(0, -60))
 
-    def flame(self, strength, cost, player, groups):
+    def flame(self, strength, cost, player):
         
         if player.energy >= cost:
             player.energy -= cost
@@ -42,9 +43,9 @@ class MagicPlayer:
                     offset_x = (direction.x * i) * TILESIZE
                     x = player.rect.centerx + offset_x + randint(-TILESIZE // 3, TILESIZE // 3)
                     y = player.rect.centery + randint(-TILESIZE // 3, TILESIZE // 3)
-                    self.animation_player.create_particles('flame', (x,y), groups)
+                    self.animation_player.create_particles('flame', (x,y), attack = True)
                 elif direction.y: #vertical
                     offset_y = (direction.y * i) * TILESIZE
                     x = player.rect.centerx + randint(-TILESIZE // 3, TILESIZE // 3)
                     y = player.rect.centery + offset_y + randint(-TILESIZE // 3, TILESIZE // 3)
-                    self.animation_player.create_particles('flame', (x,y), groups)
+                    self.animation_player.create_particles('flame', (x,y), attack = True)
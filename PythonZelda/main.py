@@ -4,8 +4,16 @@ File contains Game class to run game loop
 """
 import pygame
 import sys
+import os
+import time
+import random
 from settings import *
 from level import Level
+from support import assets, startup_assets
+from timing import use_clock
+from controls import use_keys
+from replay import SessionRecorder
+import snapshot
 
 class Game:
     """
@@ -20,46 +28,147 @@ class Game:
         pygame.display.set_caption('Zelda')
         self.clock = pygame.time.Clock()
 
+        # decodes every asset on worker threads behind a loading bar before the level is built
+        self.loading_drawn = (None, 0)
+        assets.preload(**startup_assets(), progress = self.show_loading)
+        if LOAD_REPORT:
+            print(assets.load_report())
+
+        # the world seed picks the grass images, recordings store it so replays build the same level
+        self.world_seed = random.randrange(2 ** 63)
+        random.seed(self.world_seed)
         self.level = Level()
 
+        # pristine copy of the world, restarts go back to it instead of building a new level
+        self.start_state = snapshot.capture(self.level)
+
+        # records the session, from here on every timer and key read goes through the recorder
+        self.recorder = None
+        self.start_recording()
+
         # initializes and plays background music infinitely
-        main_sound = pygame.mixer.Sound('audio/main.ogg')
-        main_sound.set_volume(0.5)
+        main_sound = assets.sound('audio/main.ogg', 0.5)
         main_sound.play(-1)
 
         #death screen setup
-        self.font = pygame.font.Font(UI_FONT, UI_FONT_SIZE)
+        self.font = assets.font(UI_FONT, UI_FONT_SIZE)
         self.text_surf = self.font.render("Haha loser", False, TEXT_COLOR)
         self.text_rect = self.text_surf.get_rect(center = (WIDTH / 2, HEIGHT / 2))
         self.restart_message = self.font.render("Press Enter to restart", False, TEXT_COLOR)
         self.restart_rect = self.restart_message.get_rect(center = (WIDTH / 2, HEIGHT - 100))
         self.would_like_to_restart = False
         
+    def show_loading(self, done, total, path):
+        """
+        draws the loading bar, called by the asset preloader after every file,
+        the screen is only redrawn when the bar grew and LOADING_REDRAW_MS passed, or at the end
+        """
+
+        pygame.event.pump()
+        bg_rect = pygame.Rect(0, 0, WIDTH // 2, BAR_HEIGHT)
+        bg_rect.center = (WIDTH / 2, HEIGHT / 2)
+        bar_rect = bg_rect.copy()
+        bar_rect.width = bg_rect.width * done // total
+
+        drawn_width, drawn_time = self.loading_drawn
+        now = time.perf_counter()
+        if done < total and (bar_rect.width == drawn_width or now - drawn_time < LOADING_REDRAW_MS / 1000):
+            return
+        self.loading_drawn = (bar_rect.width, now)
+
+        self.screen.fill(WATER_COLOR)
+        pygame.draw.rect(self.screen, UI_BG_COLOR, bg_rect)
+        pygame.draw.rect(self.screen, ENERGY_COLOR, bar_rect)
+        pygame.draw.rect(self.screen, UI_BORDER_COLOR, bg_rect, 3)
+        pygame.display.update()
+
+    def start_recording(self):
+
+        if RECORD_FOLDER:
+            os.makedirs(RECORD_FOLDER, exist_ok = True)
+            self.recorder = SessionRecorder(os.path.join(RECORD_FOLDER, time.strftime('session_%Y%m%d_%H%M%S.zrec')), self.world_seed)
+            use_clock(self.recorder)
+            use_keys(self.recorder)
+
+    def restart(self):
+        """
+        puts the level back to how it was first built, assets, display and music are kept
+        """
+
+        snapshot.restore(self.level, self.start_state)
+        self.level.upgrade.selection_index = 0
+        self.would_like_to_restart = False
+        self.start_recording()
+
+    def stop_recording(self):
+
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+            use_clock(None)
+            use_keys(None)
+
     def run(self):
         """
-        This function runs the main game loop
+        This function runs the main game loop, restarting the level after every death
+        """
+
+        while True:
+            self.play()
+            self.death_screen()
+            self.restart()
+
+    def play(self):
+        """
+        runs the level until the player dies
         """
         
         #The game loop that continues so long as the user does not die
         #or click on the exit button
         while not self.level.player_dead:
+            menu_toggled = False
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.level.close()
+                    self.stop_recording()
                     pygame.quit()
                     sys.exit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_m:
                         self.level.toggle_menu()
+                        menu_toggled = True
+                    if event.key == pygame.K_F3:
+                        self.level.profiler.toggle_overlay()
+                    if event.key == pygame.K_F5:
+                        snapshot.save(self.level, SAVE_PATH)
+                    if event.key == pygame.K_F9 and os.path.exists(SAVE_PATH):
+                        #a recording can not replay past a load, so it ends here
+                        self.stop_recording()
+                        snapshot.load(self.level, SAVE_PATH)
+
+            if self.recorder:
+                self.recorder.begin_frame(menu_toggled)
                   
             self.screen.fill(WATER_COLOR)
             self.level.run()
-            pygame.display.update()
+            if self.level.dirty_rects is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(self.level.dirty_rects)
             self.clock.tick(FPS)
         
+        self.stop_recording()
+
+    def death_screen(self):
+        """
+        shows the death screen until the player asks for a restart
+        """
+
         # loop runs after player dies and has not reset or exited
         while not self.would_like_to_restart:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.level.close()
                     pygame.quit()
                     sys.exit()
                 if event.type == pygame.KEYDOWN:
@@ -74,9 +183,7 @@ class Game:
 
 if __name__ == '__main__':
 
-    #loop allows the user to reset the game without exiting and restarting
-    while True:
-        game = Game()
-        game.run()
+    game = Game()
+    game.run()
 
 
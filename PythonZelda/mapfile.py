@@ -0,0 +1,129 @@
+"""
+File compiles the map/*.csv layers into one binary map file and reads layers back
+out of a memory map, so building a level does not have to parse any text
+
+layout, all little endian:
+    header      magic b'ZMAP', version u16, layer count u16, rows u32, cols u32
+    directory   per layer a 16 byte name and the u32 byte offset of its grid
+    grids       rows * cols int16 cells per layer, -1 is an empty cell
+
+run as a script to compile a folder of csv layers:
+    python mapfile.py map map/world.zmap
+"""
+import sys
+import mmap
+import numpy
+from os import listdir, path as os_path
+from struct import Struct
+from support import import_csv_grid
+
+MAGIC = b'ZMAP'
+VERSION = 1
+HEADER = Struct('<4sHHII')
+DIRECTORY_ENTRY = Struct('<16sI')
+CELL = numpy.dtype('<i2')
+
+def csv_layers(folder, names = None):
+    """
+    returns the map_<name>.csv layers in a folder as a name to grid dictionary,
+    only the named ones when names is given
+    """
+
+    layers = {}
+    for file_name in sorted(listdir(folder)):
+        if file_name.startswith('map_') and file_name.endswith('.csv'):
+            name = file_name[4:-4]
+            if names is None or name in names:
+                layers[name] = import_csv_grid(os_path.join(folder, file_name))
+
+    return layers
+
+def write_map(layers, out_path):
+    """
+    writes a name to grid dictionary of same sized layers into a binary map file
+    """
+
+    shapes = {grid.shape for grid in layers.values()}
+    if len(shapes) != 1:
+        raise ValueError(f'layers for {out_path} do not share one size: {shapes}')
+    rows, cols = shapes.pop()
+
+    offset = HEADER.size + DIRECTORY_ENTRY.size * len(layers)
+    grid_size = rows * cols * CELL.itemsize
+
+    with open(out_path, 'wb') as map_file:
+        map_file.write(HEADER.pack(MAGIC, VERSION, len(layers), rows, cols))
+        for index, name in enumerate(layers):
+            map_file.write(DIRECTORY_ENTRY.pack(name.encode('ascii'), offset + index * grid_size))
+        for grid in layers.values():
+            map_file.write(grid.astype(CELL).tobytes())
+
+def compile_map(folder, out_path):
+    """
+    writes all csv layers of a folder into a single binary map file
+    """
+
+    layers = csv_layers(folder)
+    write_map(layers, out_path)
+
+    return layers
+
+class MappedLayers(dict):
+    """
+    Name to grid dictionary of a compiled map file. The grids are read only views into the
+    file's memory map, so a cell is only read off disk once something looks at it
+    """
+    def __init__(self, buffer):
+
+        super().__init__()
+        self.buffer = buffer
+
+    def close(self):
+        """
+        drops the grids and unmaps the file, views of them kept elsewhere have to be dropped first
+        """
+
+        self.clear()
+        self.buffer.close()
+
+def load_compiled_map(map_path, names = None):
+    """
+    memory maps a binary map file and returns views of its grids, only the named ones when names is given
+    """
+
+    #the map holds its own handle on the file, so it can be closed straight away
+    with open(map_path, 'rb') as map_file:
+        buffer = mmap.mmap(map_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+    magic, version, layer_count, rows, cols = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION:
+        buffer.close()
+        raise ValueError(f'{map_path} is not a version {VERSION} map file')
+
+    layers = MappedLayers(buffer)
+    for index in range(layer_count):
+        name, offset = DIRECTORY_ENTRY.unpack_from(buffer, HEADER.size + index * DIRECTORY_ENTRY.size)
+        name = name.rstrip(b'\0').decode('ascii')
+        if names is None or name in names:
+            layers[name] = numpy.frombuffer(buffer, dtype = CELL, count = rows * cols, offset = offset).reshape(rows, cols)
+
+    return layers
+
+def load_map_layers(source, names = None):
+    """
+    loads map layers from either a compiled map file or a folder of csv layers,
+    only the named ones when names is given
+    """
+
+    if os_path.isdir(source):
+        return csv_layers(source, names)
+
+    return load_compiled_map(source, names)
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print('usage: python mapfile.py <csv folder> <output map file>')
+        sys.exit(1)
+
+    layers = compile_map(sys.argv[1], sys.argv[2])
+    print(f'wrote {len(layers)} layers to {sys.argv[2]}: {", ".join(layers)}')
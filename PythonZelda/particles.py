@@ -1,80 +1,148 @@
 import pygame 
-from support import import_folder
+import numpy
+from settings import *
+from support import assets
 from random import choice
 
 class AnimationPlayer:
-	def __init__(self):
+	def __init__(self, capacity = PARTICLE_CAP):
+		self.particles = ParticlePool(capacity)
 		self.frames = {
 			# magic
-			'flame': import_folder('graphics/particles/flame/frames'),
-			'aura': import_folder('graphics/particles/aura'),
-			'heal': import_folder('graphics/particles/heal/frames'),
+			'flame': assets.folder('graphics/particles/flame/frames'),
+			'aura': assets.folder('graphics/particles/aura'),
+			'heal': assets.folder('graphics/particles/heal/frames'),
 			
 			# attacks 
-			'claw': import_folder('graphics/particles/claw'),
-			'slash': import_folder('graphics/particles/slash'),
-			'sparkle': import_folder('graphics/particles/sparkle'),
-			'leaf_attack': import_folder('graphics/particles/leaf_attack'),
-			'thunder': import_folder('graphics/particles/thunder'),
+			'claw': assets.folder('graphics/particles/claw'),
+			'slash': assets.folder('graphics/particles/slash'),
+			'sparkle': assets.folder('graphics/particles/sparkle'),
+			'leaf_attack': assets.folder('graphics/particles/leaf_attack'),
+			'thunder': assets.folder('graphics/particles/thunder'),
 
 			# monster deaths
-			'squid': import_folder('graphics/particles/smoke_orange'),
-			'raccoon': import_folder('graphics/particles/raccoon'),
-			'spirit': import_folder('graphics/particles/nova'),
-			'bamboo': import_folder('graphics/particles/bamboo'),
+			'squid': assets.folder('graphics/particles/smoke_orange'),
+			'raccoon': assets.folder('graphics/particles/raccoon'),
+			'spirit': assets.folder('graphics/particles/nova'),
+			'bamboo': assets.folder('graphics/particles/bamboo'),
 			
 			# leafs 
 			'leaf': (
-				import_folder('graphics/particles/leaf1'),
-				import_folder('graphics/particles/leaf2'),
-				import_folder('graphics/particles/leaf3'),
-				import_folder('graphics/particles/leaf4'),
-				import_folder('graphics/particles/leaf5'),
-				import_folder('graphics/particles/leaf6'),
-				self.reflect_images(import_folder('graphics/particles/leaf1')),
-				self.reflect_images(import_folder('graphics/particles/leaf2')),
-				self.reflect_images(import_folder('graphics/particles/leaf3')),
-				self.reflect_images(import_folder('graphics/particles/leaf4')),
-				self.reflect_images(import_folder('graphics/particles/leaf5')),
-				self.reflect_images(import_folder('graphics/particles/leaf6'))
+				assets.folder('graphics/particles/leaf1'),
+				assets.folder('graphics/particles/leaf2'),
+				assets.folder('graphics/particles/leaf3'),
+				assets.folder('graphics/particles/leaf4'),
+				assets.folder('graphics/particles/leaf5'),
+				assets.folder('graphics/particles/leaf6'),
+				assets.folder('graphics/particles/leaf1', flip = True),
+				assets.folder('graphics/particles/leaf2', flip = True),
+				assets.folder('graphics/particles/leaf3', flip = True),
+				assets.folder('graphics/particles/leaf4', flip = True),
+				assets.folder('graphics/particles/leaf5', flip = True),
+				assets.folder('graphics/particles/leaf6', flip = True)
 				)
 		}
 
-	def reflect_images(self, frames):
-		new_frames = []
-		for frame in frames:
-			flipped_frames = pygame.transform.flip(frame, True, False)
-			new_frames.append(flipped_frames)
-		return new_frames
-
-	def create_grass_particles(self, pos, groups):
+	def create_grass_particles(self, pos):
 
 		grass_animation_frames = choice(self.frames['leaf'])
-		ParticleEffect(pos, grass_animation_frames, groups)
+		self.particles.spawn(grass_animation_frames, pos)
 
-	def create_particles(self, animation_type, pos, groups):
+	def create_particles(self, animation_type, pos, attack = False):
 
 		animation_frames = self.frames[animation_type]
-		ParticleEffect(pos, animation_frames, groups)
-
-class ParticleEffect(pygame.sprite.Sprite):
-	def __init__(self, pos, animation_frames, groups):
-		super().__init__(groups)
-		
-		self.sprite_type = 'magic'
-		self.frame_index = 0
-		self.animation_speed = 0.15
-		self.frames = animation_frames
-		self.image = self.frames[self.frame_index]
-		self.rect = self.image.get_rect(center = pos)
-
-	def animate(self):
-
-		self.frame_index += self.animation_speed
-		if self.frame_index >= len(self.frames):
-			self.kill()
-		else:
-			self.image = self.frames[int(self.frame_index)]
+		self.particles.spawn(animation_frames, pos, attack)
+
+class ParticlePool:
+	"""
+	Fixed capacity particle store, frame indices and positions live in numpy arrays.
+	Particles are not sprites, they are animated in one array step and drawn in one blits call.
+	When the pool is full new particles are dropped, so a field of cut grass can not stall a frame
+	"""
+	def __init__(self, capacity = PARTICLE_CAP, animation_speed = 0.15):
+
+		self.capacity = capacity
+		self.animation_speed = animation_speed
+
+		self.active = numpy.zeros(capacity, dtype = bool)
+		self.attack = numpy.zeros(capacity, dtype = bool)
+		self.frame_index = numpy.zeros(capacity)
+		self.frame_count = numpy.zeros(capacity)
+		self.rects = numpy.zeros((capacity, 4), dtype = int)
+		self.frames = [None] * capacity
+		self.free = list(range(capacity - 1, -1, -1))
+
+	def spawn(self, animation_frames, pos, attack = False):
+		"""
+		starts a particle centered on pos, returns False when the pool is full
+		"""
+
+		if not self.free:
+			return False
+
+		slot = self.free.pop()
+		self.frames[slot] = animation_frames
+		self.rects[slot] = animation_frames[0].get_rect(center = pos)
+		self.frame_index[slot] = 0
+		self.frame_count[slot] = len(animation_frames)
+		self.attack[slot] = attack
+		self.active[slot] = True
+
+		return True
 
 	def update(self):
-		self.animate()
\ No newline at end of file
+		"""
+		advances every particle and frees the finished ones
+		"""
+
+		active = self.active
+		self.frame_index[active] += self.animation_speed
+
+		finished = numpy.flatnonzero(active & (self.frame_index >= self.frame_count))
+		if len(finished):
+			active[finished] = False
+			for slot in finished.tolist():
+				self.frames[slot] = None
+				self.free.append(slot)
+
+	def clear(self):
+		"""
+		frees every particle
+		"""
+
+		self.active[:] = False
+		self.frames = [None] * self.capacity
+		self.free = list(range(self.capacity - 1, -1, -1))
+
+	def attack_rects(self):
+		"""
+		returns the rects of the particles that damage enemies
+		"""
+
+		return [pygame.Rect(rect) for rect in self.rects[self.active & self.attack].tolist()]
+
+	def draw(self, surface, offset, camera_rect):
+		"""
+		blits every particle on screen in one batch,
+		returns the drawn screen rects, always empty unless DIRTY_RECTS is on
+		"""
+
+		rects = self.rects
+		on_screen = (self.active
+			& (rects[:, 0] + rects[:, 2] > camera_rect.left) & (rects[:, 0] < camera_rect.right)
+			& (rects[:, 1] + rects[:, 3] > camera_rect.top) & (rects[:, 1] < camera_rect.bottom))
+
+		slots = numpy.flatnonzero(on_screen)
+		if not len(slots):
+			return []
+
+		frames = self.frames
+		offset_x = int(offset.x)
+		offset_y = int(offset.y)
+		drawn = surface.blits([(frames[slot][frame], (x - offset_x, y - offset_y))
+			for slot, frame, x, y in zip(
+				slots.tolist(),
+				self.frame_index[slots].astype(int).tolist(),
+				rects[slots, 0].tolist(),
+				rects[slots, 1].tolist())], DIRTY_RECTS)
+		return drawn or []
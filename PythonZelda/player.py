@@ -2,6 +2,8 @@ import pygame
 from entity import Entity
 from settings import *
 from support import *
+from timing import get_ticks
+from controls import get_pressed
 from debug import debug
 
 class Player(Entity):
@@ -9,7 +11,7 @@ class Player(Entity):
     def __init__(self, pos, groups, obstacle_sprites, create_attack, destroy_attack, create_magic):
         super().__init__(groups)
 
-        self.image = pygame.image.load('graphics/test/player.png').convert_alpha()
+        self.image = assets.image('graphics/test/player.png')
         self.rect = self.image.get_rect(topleft = pos)
         self.hitbox = self.rect.inflate(-6,HITBOX_OFFSET['player'])
 
@@ -54,8 +56,7 @@ class Player(Entity):
         self.invulnerable_duration = 500
 
         #import sounds
-        self.weapon_attack_sound = pygame.mixer.Sound('audio/sword.wav')
-        self.weapon_attack_sound.set_volume(0.4)
+        self.weapon_attack_sound = assets.sound('audio/sword.wav', 0.4)
 
     def import_player_assets(self):
         character_path = 'graphics/player/'
@@ -63,13 +64,16 @@ class Player(Entity):
         'right_idle':[], 'left_idle':[], 'up_idle':[], 'down_idle':[],
         'right_attack':[], 'left_attack':[], 'up_attack':[], 'down_attack':[]}
 
+        self.flicker_animations = {}
+
         for animation in self.animations.keys():
             full_path = character_path + animation
-            image_list = import_folder(full_path)
+            image_list = assets.folder(full_path)
             self.animations[animation] = image_list
+            self.flicker_animations[animation] = assets.faded(full_path, 0)
 
     def input(self):
-        keys = pygame.key.get_pressed()
+        keys = get_pressed()
 
         if not self.attacking:
             #move input
@@ -94,14 +98,14 @@ class Player(Entity):
             #attack input
             if keys[pygame.K_SPACE]:
                 self.attacking = True
-                self.attack_time = pygame.time.get_ticks()
+                self.attack_time = get_ticks()
                 self.create_attack() 
                 self.weapon_attack_sound.play()   
 
             #magic input
             if keys[pygame.K_LCTRL]:
                 self.attacking = True
-                self.attack_time = pygame.time.get_ticks()
+                self.attack_time = get_ticks()
                 #Is this supposed to be more complicated? 
                 style = self.magic
                 strength = magic_data[style]['strength'] + self.stats['magic']
@@ -112,7 +116,7 @@ class Player(Entity):
             if self.can_switch_weapon:
                 if keys[pygame.K_q]:
                     self.can_switch_weapon = False
-                    self.weapon_switch_time = pygame.time.get_ticks()
+                    self.weapon_switch_time = get_ticks()
                     self.weapon_index += 1
                 
                 if self.weapon_index > (len(list(weapon_data.keys())) - 1):
@@ -123,7 +127,7 @@ class Player(Entity):
             if self.can_switch_magic:
                 if keys[pygame.K_e]:
                     self.can_switch_magic = False
-                    self.magic_switch_time = pygame.time.get_ticks()
+                    self.magic_switch_time = get_ticks()
                     self.magic_index += 1
                 
                 if self.magic_index > (len(list(magic_data.keys())) - 1):
@@ -150,7 +154,7 @@ class Player(Entity):
             self.status = self.status.replace('_attack', '')
 
     def cooldown(self):
-        current_time = pygame.time.get_ticks()
+        current_time = get_ticks()
 
         if self.attacking:
             if current_time - self.attack_time >= self.switch_duration_cooldown + weapon_data[self.weapon]['cooldown']:
@@ -176,16 +180,9 @@ class Player(Entity):
         if self.frame_index >= len(animation):
             self.frame_index = 0
         
-        self.image = animation[int(self.frame_index)]
+        self.image = self.frame_image()
         self.rect = self.image.get_rect(center = self.hitbox.center)
 
-        #flicker
-        if not self.vulnerable:
-            alpha = self.wave_value()
-            self.image.set_alpha(alpha)
-        else:
-            self.image.set_alpha(255)
-
     def get_full_weapon_damage(self):
 
         base_damage = self.stats['attack']
@@ -0,0 +1,160 @@
+"""
+File contains the frame profiler that times each subsystem of a frame
+and shows rolling percentiles in an overlay or writes them to a trace file
+"""
+import csv
+import json
+import numpy
+from itertools import count
+from collections import deque
+from time import perf_counter
+from settings import *
+from debug import debug
+
+#trace files this process has written to and the run id of the next profiler,
+#a path is truncated the first time only so every level after that appends its own run
+opened_traces = set()
+run_ids = count(1)
+
+SECTIONS = ('streamer', 'visible_sprites.update', 'particles.update', 'enemy_ai', 'player_attack_logic', 'upgrade.update',
+    'custom_draw', 'particles.draw', 'ui.display', 'upgrade.display')
+
+class FrameProfiler:
+    """
+    Times the sections of a frame between start() and mark(name) calls.
+    Does nothing but one flag check per call while neither the overlay nor a trace is on
+    """
+    def __init__(self, trace_path = PROFILE_TRACE, window = PROFILE_WINDOW):
+
+        self.enabled = False
+        self.overlay = False
+        self.last = 0
+        self.frame_start = None
+        self.frame = 0
+        self.current = dict.fromkeys(SECTIONS, 0.0)
+        self.history = {name: deque(maxlen = window) for name in SECTIONS + ('frame',)}
+        self.lines = []
+
+        #trace file
+        self.trace_file = None
+        self.trace_writer = None
+        if trace_path:
+            self.open_trace(trace_path)
+
+    def open_trace(self, path):
+        """
+        starts writing one row per frame, json lines for a .jsonl path and csv otherwise,
+        rows carry the run id of this profiler so several levels can share one file
+        """
+
+        first = path not in opened_traces
+        opened_traces.add(path)
+        self.run = next(run_ids)
+        self.trace_file = open(path, 'w' if first else 'a', newline = '')
+        if not path.endswith('.jsonl'):
+            self.trace_writer = csv.writer(self.trace_file)
+            if first:
+                self.trace_writer.writerow(('run', 'frame', 'frame_ms') + tuple(name + '_ms' for name in SECTIONS) + ('sprites', 'collision_tests'))
+        self.enabled = True
+
+    def close(self):
+
+        if self.trace_file:
+            self.trace_file.close()
+            self.trace_file = None
+            self.trace_writer = None
+        self.enabled = self.overlay
+
+    def toggle_overlay(self):
+
+        self.overlay = not self.overlay
+        self.enabled = self.overlay or self.trace_file is not None
+        self.frame_start = None
+
+    def start(self):
+        """
+        begins timing the next section
+        """
+
+        if self.enabled:
+            self.last = perf_counter()
+
+    def mark(self, name):
+        """
+        adds the time since the last start or mark to a section
+        """
+
+        if self.enabled:
+            now = perf_counter()
+            self.current[name] += now - self.last
+            self.last = now
+
+    def end_frame(self, sprites = 0, collision_tests = 0):
+        """
+        closes a frame, frame time is the wall time between two end_frame calls
+        """
+
+        if not self.enabled:
+            return
+
+        now = perf_counter()
+        frame_time = now - self.frame_start if self.frame_start is not None else 0.0
+        self.frame_start = now
+        self.frame += 1
+
+        current = self.current
+        self.history['frame'].append(frame_time)
+        for name in SECTIONS:
+            self.history[name].append(current[name])
+
+        if self.trace_file:
+            self.write_row(frame_time, sprites, collision_tests)
+
+        if self.overlay and self.frame % PROFILE_REFRESH == 0:
+            self.lines = self.summary(sprites, collision_tests)
+
+        for name in SECTIONS:
+            current[name] = 0.0
+
+    def write_row(self, frame_time, sprites, collision_tests):
+
+        times = [round(self.current[name] * 1000, 4) for name in SECTIONS]
+        if self.trace_writer:
+            self.trace_writer.writerow([self.run, self.frame, round(frame_time * 1000, 4)] + times + [sprites, collision_tests])
+        else:
+            row = {'run': self.run, 'frame': self.frame, 'frame_ms': round(frame_time * 1000, 4)}
+            row.update(zip((name + '_ms' for name in SECTIONS), times))
+            row.update(sprites = sprites, collision_tests = collision_tests)
+            self.trace_file.write(json.dumps(row) + '\n')
+
+    def percentiles(self, name):
+        """
+        returns the rolling p50, p95 and p99 of a section in milliseconds
+        """
+
+        samples = self.history[name]
+        if not samples:
+            return (0.0, 0.0, 0.0)
+
+        return tuple(numpy.percentile(numpy.fromiter(samples, float), (50, 95, 99)) * 1000)
+
+    def summary(self, sprites, collision_tests):
+        """
+        returns the overlay text, one line per section
+        """
+
+        lines = [f'{"ms":<22}{"p50":>7}{"p95":>7}{"p99":>7}']
+        for name in ('frame',) + SECTIONS:
+            p50, p95, p99 = self.percentiles(name)
+            lines.append(f'{name:<22}{p50:>7.2f}{p95:>7.2f}{p99:>7.2f}')
+        lines.append(f'sprites {sprites}  collision tests {collision_tests}')
+
+        return lines
+
+    def draw(self):
+        """
+        draws the overlay in the top left corner below the bars
+        """
+
+        for index, line in enumerate(self.lines):
+            debug(line, y = 60 + index * 22)
@@ -0,0 +1,202 @@
+"""
+File records game sessions to a compact binary stream and replays them headless,
+so a session from a player's machine runs again frame for frame on ours
+
+layout, all little endian:
+    header      magic b'ZREC', version u16, world seed u64, play seed u64, start ticks u32, map source length u16,
+                map source utf-8
+    frames      per frame the game time in ticks u32 and a u16 bit mask of REPLAY_KEYS,
+                the top bit is set when the upgrade menu was toggled that frame
+
+the world seed is applied before the level is built, it picks the grass images, the play seed once
+it is built, so a session recorded after a restart replays on a freshly built level just the same.
+replays match the recording exactly while STREAM_WORLD is off, streamed chunks arrive whenever
+the loader thread gets to them so they can land on different frames
+
+usage: python replay.py <session file> [render every n frames]
+"""
+import sys
+import time
+import random
+import numpy
+from struct import Struct
+from controls import KeyState
+from settings import *
+import pygame
+
+MAGIC = b'ZREC'
+VERSION = 3
+HEADER = Struct('<4sHQQIH')
+FRAME = numpy.dtype([('ticks', '<u4'), ('keys', '<u2')])
+MENU_BIT = 1 << 15
+
+#every key the player and upgrade menu read, in bit order
+REPLAY_KEYS = (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT,
+    pygame.K_SPACE, pygame.K_LCTRL, pygame.K_q, pygame.K_e)
+
+def key_state(mask):
+    """
+    returns the KeyState for a bit mask of REPLAY_KEYS
+    """
+
+    return KeyState(key for bit, key in enumerate(REPLAY_KEYS) if mask & (1 << bit))
+
+class SessionRecorder:
+    """
+    Seeds the global rng and logs the game time and keys of every frame,
+    world seed is the one the level was built with.
+    While recording it is the game's clock and key source, so each frame sees
+    exactly the time and keys that were written down
+    """
+    def __init__(self, path, world_seed, map_source = MAP_SOURCE, seed = None):
+
+        self.world_seed = world_seed
+        self.seed = random.randrange(2 ** 63) if seed is None else seed
+        random.seed(self.seed)
+
+        self.time = pygame.time.get_ticks()
+        self.keys = KeyState()
+        self.frames = 0
+
+        source = map_source.encode('utf-8')
+        self.session_file = open(path, 'wb')
+        self.session_file.write(HEADER.pack(MAGIC, VERSION, self.world_seed, self.seed, self.time, len(source)) + source)
+
+    def begin_frame(self, menu_toggled = False):
+        """
+        samples the clock and keyboard once for the coming frame and writes them out
+        """
+
+        pressed = pygame.key.get_pressed()
+        mask = MENU_BIT if menu_toggled else 0
+        for bit, key in enumerate(REPLAY_KEYS):
+            if pressed[key]:
+                mask |= 1 << bit
+
+        self.time = pygame.time.get_ticks()
+        self.keys = key_state(mask)
+        self.session_file.write(numpy.array([(self.time, mask)], dtype = FRAME).tobytes())
+
+        self.frames += 1
+        if self.frames % RECORD_FLUSH_FRAMES == 0:
+            self.session_file.flush()
+
+    def get_ticks(self):
+
+        return self.time
+
+    def get_pressed(self):
+
+        return self.keys
+
+    def close(self):
+
+        self.session_file.close()
+
+def load_session(path):
+    """
+    returns the world and play seeds, start ticks, map source and frame records of a session file,
+    a frame cut short by a crash while it was written is dropped
+    """
+
+    with open(path, 'rb') as session_file:
+        data = session_file.read()
+
+    magic, version, world_seed, seed, start_ticks, source_length = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{path} is not a version {VERSION} session file')
+
+    source_end = HEADER.size + source_length
+    map_source = data[HEADER.size:source_end].decode('utf-8')
+    frames = numpy.frombuffer(data, dtype = FRAME, count = (len(data) - source_end) // FRAME.itemsize, offset = source_end)
+
+    return world_seed, seed, start_ticks, map_source, frames
+
+class ReplayInput:
+    """
+    Clock and key source that hands out the recorded time and keys frame by frame
+    """
+    def __init__(self, start_ticks, frames):
+
+        self.ticks = frames['ticks'].tolist()
+        self.masks = frames['keys'].tolist()
+        self.time = start_ticks
+        self.keys = KeyState()
+        self.frame = 0
+
+    def begin_frame(self):
+        """
+        loads the next recorded frame, returns whether the menu was toggled in it
+        """
+
+        mask = self.masks[self.frame]
+        self.time = self.ticks[self.frame]
+        self.keys = key_state(mask)
+        self.frame += 1
+
+        return bool(mask & MENU_BIT)
+
+    def get_ticks(self):
+
+        return self.time
+
+    def get_pressed(self):
+
+        return self.keys
+
+    def tick(self, framerate = 0):
+        """
+        time moves with the recording, not with tick calls
+        """
+
+        return 0
+
+class SessionReplay:
+    """
+    Runs a recorded session headless as fast as the cpu allows
+    """
+    def __init__(self, path, render_every = 0):
+
+        #headless switches SDL to its dummy drivers, so only replays may import it
+        from headless import HeadlessSim
+
+        world_seed, seed, start_ticks, map_source, frames = load_session(path)
+        self.input = ReplayInput(start_ticks, frames)
+        self.length = len(frames)
+
+        random.seed(world_seed)
+        self.sim = HeadlessSim(render_every = render_every, map_source = map_source, clock = self.input, keys = self.input)
+        self.level = self.sim.level
+        random.seed(seed)
+
+    def step(self):
+
+        if self.input.begin_frame():
+            self.level.toggle_menu()
+        self.sim.step()
+
+    def run(self, frames = None):
+        """
+        replays the remaining frames, or at most frames of them, returns how many ran
+        """
+
+        remaining = self.length - self.input.frame
+        frames = remaining if frames is None else min(frames, remaining)
+
+        ran = 0
+        while ran < frames and not self.level.player_dead:
+            self.step()
+            ran += 1
+
+        return ran
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('usage: python replay.py <session file> [render every n frames]')
+        sys.exit(1)
+
+    replay = SessionReplay(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 0)
+    start = time.perf_counter()
+    ran = replay.run()
+    elapsed = time.perf_counter() - start
+    print(f'replayed {ran} of {replay.length} frames in {elapsed:.2f}s ({ran / elapsed:.0f} frames per second)')
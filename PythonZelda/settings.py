@@ -2,6 +2,50 @@ WIDTH = 1280
 HEIGHT = 720
 FPS = 60
 TILESIZE = 64
+
+# map layers, either the folder of csv layers or a file compiled from it with mapfile.py
+MAP_SOURCE = 'map'
+
+# static world layer drawn in CHUNK_SIZE x CHUNK_SIZE tile chunks,
+# baking also renders grass into the cached chunks for slow machines,
+# baked chunks more than BAKE_KEEP_CHUNKS chunks off screen are freed
+CHUNK_SIZE = 8
+BAKE_STATIC_LAYERS = False
+BAKE_KEEP_CHUNKS = 1
+
+# chunk streaming, chunks within STREAM_RADIUS of the player are kept alive
+# and at most STREAM_BUDGET read chunks are turned into sprites per frame
+STREAM_WORLD = False
+STREAM_RADIUS = 2
+STREAM_BUDGET = 1
+
+# enemies further than notice_radius + ENEMY_SLEEP_MARGIN from the player fall asleep
+# and wake again inside notice_radius + ENEMY_WAKE_MARGIN
+ENEMY_WAKE_MARGIN = 640
+ENEMY_SLEEP_MARGIN = 768
+
+# attacks in one frame from which awake enemies are looked up in a grid rebuilt for that frame,
+# below it testing every awake enemy is cheaper, see benchmark_attacks.py
+ATTACK_GRID_MIN = 32
+
+# most particles alive at once, new ones are dropped when the pool is full
+PARTICLE_CAP = 512
+
+# packed frame sheets built with atlas.py, frame folders are read one by one when it is missing
+ATLAS_INDEX = 'graphics/atlas/atlas.json'
+
+# threads decoding images and sounds while the game starts, LOAD_REPORT prints the slowest files
+ASSET_WORKERS = 4
+LOAD_REPORT = False
+# the loading bar is redrawn at most this often in milliseconds
+LOADING_REDRAW_MS = 50
+
+# frame profiler, F3 toggles the overlay, a PROFILE_TRACE path ending in .jsonl or .csv records every frame,
+# the file is started fresh once per process and every level after that appends rows under its own run id
+PROFILE_TRACE = None
+PROFILE_WINDOW = 300
+PROFILE_REFRESH = 15
+
 HITBOX_OFFSET = {
 	'player': -26,
 	'object': -40,
@@ -15,6 +59,17 @@ ENERGY_BAR_WIDTH = 140
 ITEM_BOX_SIZE = 80
 UI_FONT = 'graphics/font/joystix.ttf'
 UI_FONT_SIZE = 18
+# rendered text surfaces kept for reuse
+TEXT_CACHE_SIZE = 256
+# folder every played session is recorded into for replay.py, nothing is recorded when None
+RECORD_FOLDER = None
+# recordings are flushed to disk this often in frames, so a crash loses at most that many
+RECORD_FLUSH_FRAMES = 60
+# F5 saves a snapshot of the level here and F9 loads it back
+SAVE_PATH = 'quicksave.zsav'
+
+# present only the screen rects that changed while the camera stands still
+DIRTY_RECTS = False
 
 # general colors
 WATER_COLOR = '#71ddee'
@@ -46,10 +101,13 @@ magic_data = {
 	'flame': {'strength': 5,'cost': 20,'graphic':'graphics/particles/flame/fire.png'},
 	'heal' : {'strength': 20,'cost': 10,'graphic':'graphics/particles/heal/heal.png'}}
 
+# map tile id the player spawns on, monsters carry their own tile_id
+PLAYER_TILE_ID = 394
+
 # enemy
 monster_data = {
-	'squid': {'health': 100,'exp':100,'damage':20,'attack_type': 'slash', 'attack_sound':'audio/attack/slash.wav', 'speed': 3, 'resistance': 3, 'attack_radius': 80, 'notice_radius': 360},
-	'raccoon': {'health': 300,'exp':250,'damage':40,'attack_type': 'claw',  'attack_sound':'audio/attack/claw.wav','speed': 2, 'resistance': 3, 'attack_radius': 120, 'notice_radius': 400},
-	'spirit': {'health': 100,'exp':110,'damage':8,'attack_type': 'thunder', 'attack_sound':'audio/attack/fireball.wav', 'speed': 4, 'resistance': 3, 'attack_radius': 60, 'notice_radius': 350},
-	'bamboo': {'health': 70,'exp':120,'damage':6,'attack_type': 'leaf_attack', 'attack_sound':'audio/attack/slash.wav', 'speed': 3, 'resistance': 3, 'attack_radius': 50, 'notice_radius': 300}}
+	'squid': {'health': 100,'exp':100,'damage':20,'attack_type': 'slash', 'attack_sound':'audio/attack/slash.wav', 'speed': 3, 'resistance': 3, 'attack_radius': 80, 'notice_radius': 360, 'tile_id': 393},
+	'raccoon': {'health': 300,'exp':250,'damage':40,'attack_type': 'claw',  'attack_sound':'audio/attack/claw.wav','speed': 2, 'resistance': 3, 'attack_radius': 120, 'notice_radius': 400, 'tile_id': 392},
+	'spirit': {'health': 100,'exp':110,'damage':8,'attack_type': 'thunder', 'attack_sound':'audio/attack/fireball.wav', 'speed': 4, 'resistance': 3, 'attack_radius': 60, 'notice_radius': 350, 'tile_id': 391},
+	'bamboo': {'health': 70,'exp':120,'damage':6,'attack_type': 'leaf_attack', 'attack_sound':'audio/attack/slash.wav', 'speed': 3, 'resistance': 3, 'attack_radius': 50, 'notice_radius': 300, 'tile_id': 390}}
 
@@ -0,0 +1,313 @@
+"""
+File saves and restores the state of a running Level as a compact binary snapshot,
+either as bytes kept in memory for checkpoints or as a file on disk.
+Restoring works on the live Level, so no asset is loaded and no map is read again
+
+layout, all little endian:
+    header      magic b'ZSAV', version u16, map source length u16, enemy count u32, gone cell count u32, map source utf-8
+    player      PLAYER struct
+    enemies     one ENEMY record per enemy alive, sleeping ones included
+    gone        one GONE record per map cell whose grass was cut or whose monster was killed
+
+timers are stored as the milliseconds since they started, so a snapshot can be restored at any game time,
+NEVER marks a timer that was never started and comes back as None
+"""
+import numpy
+from struct import Struct
+from settings import *
+from timing import get_ticks
+import pygame
+
+MAGIC = b'ZSAV'
+VERSION = 2
+HEADER = Struct('<4sHHII')
+
+#hitbox topleft, direction, frame index, status, weapon and magic index, flags,
+#health, energy, exp, the stats and upgrade costs in player.stats order, the attack, hurt and switch timers
+#and how many enemies the player comes after in update order
+PLAYER = Struct('<ii2ddBBBB3d5d5d4iI')
+PLAYER_FLAGS = ('attacking', 'vulnerable', 'can_switch_weapon', 'can_switch_magic')
+
+ENEMY = numpy.dtype([
+    ('monster', 'u1'), ('spawn_x', '<i4'), ('spawn_y', '<i4'), ('x', '<i4'), ('y', '<i4'),
+    ('direction_x', '<f8'), ('direction_y', '<f8'), ('frame_index', '<f8'), ('health', '<f8'),
+    ('status', 'u1'), ('can_attack', 'u1'), ('vulnerable', 'u1'), ('attack_age', '<i4'), ('hit_age', '<i4')])
+
+#map layers cells can disappear from, in the order their codes go
+GONE_LAYERS = ('grass', 'entities')
+GONE = numpy.dtype([('layer', 'u1'), ('row', '<u2'), ('col', '<u2')])
+
+ENEMY_STATUSES = ('idle', 'move', 'attack')
+
+#timers only ever run forward, so no started timer has a negative age
+NEVER = -1
+
+def age(now, started):
+    """
+    returns how long ago a timer started, NEVER for one that never ran
+    """
+
+    return NEVER if started is None else now - started
+
+def started_at(now, timer_age):
+    """
+    turns a stored age back into the game time its timer started, None for one that never ran
+    """
+
+    return None if timer_age == NEVER else now - timer_age
+
+def cell_of(pos):
+
+    return (pos[1] // TILESIZE, pos[0] // TILESIZE)
+
+def gone_cells(level):
+    """
+    returns the (layer, cell) pairs of cut grass and killed monsters
+    """
+
+    if level.streamer:
+        #unloaded chunks remember their own, loaded chunks and kept enemies are checked sprite by sprite
+        gone = set().union(*level.streamer.removed.values())
+        for sprites in level.streamer.loaded.values():
+            gone.update((style, cell) for style, cell, sprite in sprites if style in GONE_LAYERS and not sprite.alive())
+        gone.update(key for key, sprite in level.streamer.kept.items() if not sprite.alive())
+        return {(style, cell) for style, cell in gone if style in GONE_LAYERS}
+
+    monster_ids = [info['tile_id'] for info in monster_data.values()]
+    alive = {
+        'grass': {cell_of(grass.rect.topleft) for grass in level.grass_sprites},
+        'entities': {cell_of(enemy.spawn_pos) for enemy in level.enemy_sprites},
+    }
+    placed = {
+        'grass': level.layouts['grass'] != -1,
+        'entities': numpy.isin(level.layouts['entities'], monster_ids),
+    }
+
+    gone = set()
+    for style in GONE_LAYERS:
+        rows, cols = numpy.nonzero(placed[style])
+        gone.update((style, cell) for cell in zip(rows.tolist(), cols.tolist()) if cell not in alive[style])
+
+    return gone
+
+def update_rank(level):
+    """
+    returns how many enemies are updated before the player
+    """
+
+    rank = 0
+    for sprite in level.visible_sprites:
+        if sprite is level.player:
+            break
+        if getattr(sprite, 'sprite_type', None) == 'enemy':
+            rank += 1
+
+    return rank
+
+def capture(level):
+    """
+    returns the state of a level as snapshot bytes
+    """
+
+    now = get_ticks()
+    player = level.player
+    statuses = list(player.animations)
+    monsters = list(monster_data)
+
+    player_data = PLAYER.pack(
+        player.hitbox.x, player.hitbox.y, player.direction.x, player.direction.y, player.frame_index,
+        statuses.index(player.status), player.weapon_index, player.magic_index,
+        sum(1 << bit for bit, flag in enumerate(PLAYER_FLAGS) if getattr(player, flag)),
+        player.health, player.energy, player.exp,
+        *player.stats.values(), *player.upgrade_cost.values(),
+        age(now, getattr(player, 'attack_time', None)),
+        age(now, player.hurt_time),
+        age(now, player.weapon_switch_time),
+        age(now, getattr(player, 'magic_switch_time', None)),
+        update_rank(level))
+
+    enemies = numpy.array([(
+        monsters.index(enemy.monster_name), enemy.spawn_pos[0], enemy.spawn_pos[1], enemy.hitbox.x, enemy.hitbox.y,
+        enemy.direction.x, enemy.direction.y, enemy.frame_index, enemy.health,
+        ENEMY_STATUSES.index(enemy.status), enemy.can_attack, enemy.vulnerable,
+        age(now, enemy.attack_timer), age(now, enemy.hit_time))
+        for enemy in level.enemy_sprites], dtype = ENEMY)
+
+    gone = numpy.array([(GONE_LAYERS.index(style), row, col) for style, (row, col) in sorted(gone_cells(level))], dtype = GONE)
+
+    source = level.map_source.encode('utf-8')
+    return b''.join((
+        HEADER.pack(MAGIC, VERSION, len(source), len(enemies), len(gone)),
+        source, player_data, enemies.tobytes(), gone.tobytes()))
+
+def read(data):
+    """
+    splits snapshot bytes into the map source, player values, enemy records and gone cells
+    """
+
+    magic, version, source_length, enemy_count, gone_count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError('not a snapshot')
+    if version != VERSION:
+        raise ValueError(f'version {version} snapshots are not supported, this build reads version {VERSION} only')
+
+    offset = HEADER.size
+    map_source = bytes(data[offset:offset + source_length]).decode('utf-8')
+    offset += source_length
+    player = PLAYER.unpack_from(data, offset)
+    offset += PLAYER.size
+    enemies = numpy.frombuffer(data, dtype = ENEMY, count = enemy_count, offset = offset)
+    offset += enemies.nbytes
+    gone = numpy.frombuffer(data, dtype = GONE, count = gone_count, offset = offset)
+
+    return map_source, player, enemies, gone
+
+def restore_player(level, values, now):
+
+    player = level.player
+    x, y, direction_x, direction_y, frame_index, status, weapon_index, magic_index, flags = values[:9]
+    health, energy, exp = values[9:12]
+    stats = values[12:17]
+    costs = values[17:22]
+    attack_age, hurt_age, weapon_switch_age, magic_switch_age = values[22:26]
+
+    player.hitbox.topleft = (x, y)
+    player.direction = pygame.math.Vector2(direction_x, direction_y)
+    player.frame_index = frame_index
+    player.status = list(player.animations)[status]
+    player.weapon_index = weapon_index
+    player.weapon = list(weapon_data)[weapon_index]
+    player.magic_index = magic_index
+    player.magic = list(magic_data)[magic_index]
+    for bit, flag in enumerate(PLAYER_FLAGS):
+        setattr(player, flag, bool(flags & (1 << bit)))
+
+    player.health = health
+    player.energy = energy
+    #exp is a whole number until an upgrade is paid for, doubles hold either exactly
+    player.exp = int(exp) if exp.is_integer() else exp
+    player.stats.update(zip(player.stats, stats))
+    player.upgrade_cost.update(zip(player.upgrade_cost, costs))
+
+    player.attack_time = started_at(now, attack_age)
+    player.hurt_time = started_at(now, hurt_age)
+    player.weapon_switch_time = started_at(now, weapon_switch_age)
+    player.magic_switch_time = started_at(now, magic_switch_age)
+
+    player.image = player.frame_image()
+    player.rect = player.image.get_rect(center = player.hitbox.center)
+
+    #a running attack gets its weapon back
+    level.destroy_attack()
+    if player.attacking:
+        level.create_attack()
+
+def restore_world(level, gone):
+    """
+    cuts and regrows grass and kills monsters so the map matches the gone cells
+    """
+
+    if level.streamer:
+        #chunks are loaded again once the enemies are back, with the snapshot's memory of what is gone
+        level.streamer.reset(gone)
+        return
+
+    grass = {cell_of(sprite.rect.topleft): sprite for sprite in level.grass_sprites}
+    layout = level.layouts['grass']
+    rows, cols = numpy.nonzero(layout != -1)
+    for cell, tile_id in zip(zip(rows.tolist(), cols.tolist()), layout[rows, cols].tolist()):
+        if ('grass', cell) in gone:
+            if cell in grass:
+                grass[cell].kill()
+        elif cell not in grass:
+            level.spawn_grass((cell[1] * TILESIZE, cell[0] * TILESIZE), tile_id)
+
+def restore_enemies(level, records, gone, now, rank):
+    """
+    moves every enemy to its recorded state, spawning the ones killed since
+    """
+
+    level.enemy_sprites.wake_all()
+    enemies = {tuple(enemy.spawn_pos): enemy for enemy in level.enemy_sprites}
+    recorded = set()
+    ordered = []
+    monsters = list(monster_data)
+
+    for record in records.tolist():
+        monster, spawn_x, spawn_y, x, y, direction_x, direction_y, frame_index, health, status, can_attack, vulnerable, attack_age, hit_age = record
+        spawn_pos = (spawn_x, spawn_y)
+        recorded.add(spawn_pos)
+
+        enemy = enemies.get(spawn_pos)
+        if enemy is None:
+            enemy = level.spawn_enemy(monsters[monster], spawn_pos)
+            #a streamed enemy lives on its own, its chunk must not spawn it again
+            if level.streamer:
+                level.streamer.kept[('entities', cell_of(spawn_pos))] = enemy
+        ordered.append(enemy)
+
+        enemy.hitbox.topleft = (x, y)
+        enemy.direction = pygame.math.Vector2(direction_x, direction_y)
+        enemy.frame_index = frame_index
+        enemy.health = health
+        enemy.status = ENEMY_STATUSES[status]
+        enemy.can_attack = bool(can_attack)
+        enemy.vulnerable = bool(vulnerable)
+        enemy.attack_timer = started_at(now, attack_age)
+        enemy.hit_time = started_at(now, hit_age)
+        enemy.image = enemy.frame_image()
+        enemy.rect = enemy.image.get_rect(center = enemy.hitbox.center)
+
+    #enemies the snapshot has no record of were dead by then
+    for spawn_pos, enemy in enemies.items():
+        if spawn_pos not in recorded and ('entities', cell_of(spawn_pos)) in gone:
+            enemy.kill()
+
+    #groups update and attack in the order sprites joined them, flame and death particles draw from
+    #the rng in that order, so enemies rejoin in the recorded order with the player at its rank
+    player = level.player
+    player.remove(level.visible_sprites)
+    for index, enemy in enumerate(ordered):
+        if index == rank:
+            player.add(level.visible_sprites)
+        groups = enemy.groups()
+        enemy.remove(*groups)
+        enemy.add(*groups)
+    if not player.alive():
+        player.add(level.visible_sprites)
+
+    level.enemy_sprites.dirty = True
+
+def restore(level, data):
+    """
+    puts a level back into the state of snapshot bytes taken from a level on the same map
+    """
+
+    map_source, player, enemies, gone = read(data)
+    if map_source != level.map_source:
+        raise ValueError(f'snapshot is of map {map_source}, the level runs {level.map_source}')
+
+    now = get_ticks()
+    gone = {(GONE_LAYERS[layer], (row, col)) for layer, row, col in gone.tolist()}
+
+    restore_player(level, player, now)
+    restore_world(level, gone)
+    restore_enemies(level, enemies, gone, now, player[26])
+    if level.streamer:
+        level.streamer.update(level.player.rect.center, wait = True)
+
+    #nothing in flight survives, the next frame redraws everything
+    level.animation_player.particles.clear()
+    level.game_paused = False
+    level.player_dead = False
+    level.visible_sprites.last_camera = None
+
+def save(level, path):
+
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(capture(level))
+
+def load(level, path):
+
+    with open(path, 'rb') as snapshot_file:
+        restore(level, snapshot_file.read())
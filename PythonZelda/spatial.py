@@ -0,0 +1,110 @@
+"""
+File contains a sprite group backed by a uniform spatial hash grid
+so collision checks only look at sprites near a given rect
+"""
+import pygame
+from settings import *
+
+def cell_range(rect, size):
+    """
+    returns every grid cell key that the rect overlaps
+    """
+
+    left = rect.left // size
+    right = (rect.right - 1) // size
+    top = rect.top // size
+    bottom = (rect.bottom - 1) // size
+
+    return [(x,y) for x in range(left, right + 1) for y in range(top, bottom + 1)]
+
+class SpatialGroup(pygame.sprite.Group):
+    """
+    Sprite group that also buckets its sprites by the grid cells their hitbox (or box) covers.
+    Sprites are expected to stay put once added (tiles), groups of moving sprites
+    call refresh before they are queried. Killing a sprite removes it from the grid
+    straight away. StaticTile records share the grid without being group members
+    """
+    def __init__(self, *sprites, cell_size = TILESIZE, box = 'hitbox'):
+
+        self.cell_size = cell_size
+        self.box = box
+        self.cells = {}
+        self.sprite_cells = {}
+        self.order = {}
+        self.next_order = 0
+        self.candidates = 0
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        self.insert(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.discard(sprite)
+
+    def add_static(self, tile):
+        """
+        adds a StaticTile record to the grid, it is not a sprite so the group itself never holds it
+        """
+
+        self.insert(tile)
+
+    def remove_static(self, tile):
+
+        self.discard(tile)
+
+    def insert(self, sprite):
+        """
+        buckets a sprite or static tile into every cell its hitbox covers,
+        a sprite still being built has no box yet and is bucketed by the next refresh
+        """
+
+        if sprite in self.sprite_cells:
+            return
+
+        box = getattr(sprite, self.box, None)
+        keys = cell_range(box, self.cell_size) if box else []
+        for key in keys:
+            self.cells.setdefault(key, []).append(sprite)
+        self.sprite_cells[sprite] = keys
+        self.order[sprite] = self.next_order
+        self.next_order += 1
+
+    def discard(self, sprite):
+
+        for key in self.sprite_cells.pop(sprite, ()):
+            bucket = self.cells[key]
+            bucket.remove(sprite)
+            if not bucket:
+                del self.cells[key]
+        self.order.pop(sprite, None)
+
+    def refresh(self):
+        """
+        rebuckets every sprite by where its box is now, keeping the order they were added in
+        """
+
+        cells = {}
+        for sprite in self.sprite_cells:
+            keys = cell_range(getattr(sprite, self.box), self.cell_size)
+            for key in keys:
+                cells.setdefault(key, []).append(sprite)
+            self.sprite_cells[sprite] = keys
+        self.cells = cells
+
+    def near(self, rect):
+        """
+        returns the sprites in the cells the rect overlaps, in the order they were added,
+        candidates counts how many were handed out for the profiler
+        """
+
+        cells = self.cells
+        found = set()
+        for key in cell_range(rect, self.cell_size):
+            bucket = cells.get(key)
+            if bucket:
+                found.update(bucket)
+        self.candidates += len(found)
+
+        return sorted(found, key = self.order.__getitem__)
@@ -0,0 +1,189 @@
+"""
+File contains the chunk streamer that keeps only the map around the player alive
+Map cells are read on a background thread, sprites are made on the main thread
+"""
+import numpy
+from math import ceil
+from queue import Queue, Empty
+from threading import Thread, Event
+from settings import *
+
+class ChunkStreamer:
+    """
+    Loads the tiles, grass and enemies of the chunks around a position and unloads far ones.
+    Cut grass and killed enemies are remembered per chunk so they stay gone when it comes back.
+    Enemies still alive when their chunk unloads are kept with their state, wherever they
+    wandered to, and their spawn cell is skipped while they live
+    """
+    def __init__(self, layouts, spawners, chunk_size = CHUNK_SIZE, radius = STREAM_RADIUS, budget = STREAM_BUDGET):
+
+        self.layouts = layouts
+        self.spawners = spawners
+        self.chunk_size = chunk_size
+        self.chunk_px = chunk_size * TILESIZE
+        self.radius = radius
+        self.budget = budget
+
+        rows, cols = next(iter(layouts.values())).shape
+        self.chunk_rows = ceil(rows / chunk_size)
+        self.chunk_cols = ceil(cols / chunk_size)
+
+        #chunk state
+        self.loaded = {}
+        self.pending = set()
+        self.removed = {}
+        self.kept = {}
+
+        #background reader
+        self.requests = Queue()
+        self.ready = Queue()
+        self.stopped = Event()
+        self.worker = Thread(target = self.work, daemon = True)
+        self.worker.start()
+
+    def stop(self):
+        """
+        ends the background reader, call it when the level goes away
+        """
+
+        self.stopped.set()
+        self.requests.put(None)
+        self.worker.join()
+
+    def find(self, style, tile_id):
+        """
+        returns the first cell of a layer holding tile_id, or None.
+        The layer is read a band of chunk rows at a time, so no map sized array is made
+        """
+
+        layout = self.layouts[style]
+        for top in range(0, layout.shape[0], self.chunk_size):
+            rows, cols = numpy.nonzero(layout[top:top + self.chunk_size] == tile_id)
+            if len(rows):
+                return (top + int(rows[0]), int(cols[0]))
+
+        return None
+
+    def chunk_of(self, cell):
+
+        return (cell[1] // self.chunk_size, cell[0] // self.chunk_size)
+
+    def read_chunk(self, key):
+        """
+        collects the non empty cells of every layer inside a chunk, runs on the worker thread
+        """
+
+        left = key[0] * self.chunk_size
+        top = key[1] * self.chunk_size
+        cells = []
+
+        for style, layout in self.layouts.items():
+            block = layout[top:top + self.chunk_size, left:left + self.chunk_size]
+            rows, cols = numpy.nonzero(block != -1)
+            for row_index, col_index, tile_id in zip(rows.tolist(), cols.tolist(), block[rows, cols].tolist()):
+                cells.append((style, (top + row_index, left + col_index), tile_id))
+
+        return cells
+
+    def work(self):
+
+        while not self.stopped.is_set():
+            key = self.requests.get()
+            if key is None:
+                break
+            self.ready.put((key, self.read_chunk(key)))
+
+    def chunks_around(self, pos, radius):
+        """
+        returns the keys of the chunks within radius chunks of a pixel position
+        """
+
+        center_x = int(pos[0]) // self.chunk_px
+        center_y = int(pos[1]) // self.chunk_px
+
+        return {(x,y)
+            for x in range(max(0, center_x - radius), min(self.chunk_cols, center_x + radius + 1))
+            for y in range(max(0, center_y - radius), min(self.chunk_rows, center_y + radius + 1))}
+
+    def load(self, key, cells):
+        """
+        spawns the sprites of a chunk, skipping what was cut or killed before and enemies kept alive elsewhere
+        """
+
+        removed = self.removed.setdefault(key, set())
+        sprites = []
+        for style, cell, tile_id in cells:
+            if (style, cell) in removed:
+                continue
+            kept = self.kept.get((style, cell))
+            if kept:
+                if kept.alive():
+                    continue
+                del self.kept[(style, cell)]
+                removed.add((style, cell))
+                continue
+            sprite = self.spawners[style]((cell[1] * TILESIZE, cell[0] * TILESIZE), tile_id)
+            if sprite:
+                sprites.append((style, cell, sprite))
+
+        self.loaded[key] = sprites
+
+    def unload(self, key):
+        """
+        kills the sprites of a chunk and remembers which ones were already gone,
+        enemies that are still alive are kept instead
+        """
+
+        removed = self.removed.setdefault(key, set())
+        for style, cell, sprite in self.loaded.pop(key):
+            if not sprite.alive():
+                removed.add((style, cell))
+            elif style == 'entities':
+                self.kept[(style, cell)] = sprite
+            else:
+                sprite.kill()
+
+    def reset(self, removed):
+        """
+        kills every loaded sprite and kept enemy, from then on only the (style, cell) pairs in removed stay gone
+        """
+
+        sprites = [sprite for chunk in self.loaded.values() for style, cell, sprite in chunk] + list(self.kept.values())
+        for sprite in sprites:
+            if sprite.alive():
+                sprite.kill()
+
+        self.loaded = {}
+        self.kept = {}
+        self.removed = {}
+        for style, cell in removed:
+            self.removed.setdefault(self.chunk_of(cell), set()).add((style, cell))
+
+    def update(self, pos, wait = False):
+        """
+        requests the chunks around pos, unloads far away ones and spawns a few read chunks,
+        with wait the call blocks until every requested chunk is in
+        """
+
+        wanted = self.chunks_around(pos, self.radius)
+        keep = self.chunks_around(pos, self.radius + 1)
+
+        for key in wanted:
+            if key not in self.loaded and key not in self.pending:
+                self.pending.add(key)
+                self.requests.put(key)
+
+        for key in [key for key in self.loaded if key not in keep]:
+            self.unload(key)
+
+        spawned = 0
+        while self.pending and (wait or spawned < self.budget):
+            try:
+                key, cells = self.ready.get(block = wait)
+            except Empty:
+                break
+
+            self.pending.discard(key)
+            if key in keep:
+                self.load(key, cells)
+                spawned += 1
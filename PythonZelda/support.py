@@ -1,6 +1,14 @@
 import pygame
+import numpy
 from csv import reader
-from os import walk
+from os import listdir, walk, path as os_path
+from time import perf_counter
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from settings import *
+
+#folders holding animation frames, one image per frame
+FRAME_ROOTS = ('graphics/player', 'graphics/monsters', 'graphics/particles', 'graphics/grass', 'graphics/objects')
 
 def import_csv_layout(path):
     """
@@ -15,23 +23,274 @@ def import_csv_layout(path):
             terrain_map.append(list(row))
         return terrain_map
 
+def import_csv_grid(path):
+    """
+    reads csv files into a 2d int16 grid, empty cells are -1
+    """
+
+    return numpy.loadtxt(path, delimiter = ',', dtype = numpy.int16, ndmin = 2)
+
+def frame_files(path):
+    """
+    returns the image file names of a folder sorted by name, which is frame order
+    """
+
+    return sorted(name for name in listdir(path) if name.lower().endswith('.png'))
+
+def frame_folders(roots = FRAME_ROOTS):
+    """
+    returns every folder below the roots that holds frames, sorted
+    """
+
+    folders = []
+    for root in roots:
+        for folder, _, _ in walk(root):
+            if frame_files(folder):
+                folders.append(folder.replace(os_path.sep, '/'))
+
+    return sorted(folders)
+
+def startup_assets():
+    """
+    returns the images, opaque images, frame folders and sounds a level needs, for AssetCache.preload
+    """
+
+    images = ['graphics/test/player.png']
+    images += [f'graphics/weapons/{weapon}/{direction}.png' for weapon in weapon_data for direction in ('up', 'down', 'left', 'right')]
+    images += [weapon['graphic'] for weapon in weapon_data.values()]
+    images += [magic['graphic'] for magic in magic_data.values()]
+
+    sounds = ['audio/death.wav', 'audio/hit.wav', 'audio/sword.wav', 'audio/heal.wav', 'audio/Fire.wav', 'audio/main.ogg']
+    sounds += sorted({monster['attack_sound'] for monster in monster_data.values()})
+
+    return {'images': images, 'opaque': ['graphics/tilemap/ground.png'], 'folders': frame_folders(), 'sounds': sounds}
+
+def decode(kind, path):
+    """
+    reads and decodes one asset file on a worker thread, returns it with the seconds it took
+    """
+
+    start = perf_counter()
+    if kind == 'sound':
+        asset = pygame.mixer.Sound(path)
+    else:
+        asset = pygame.image.load(path)
+
+    return asset, perf_counter() - start
+
 def import_folder(path):
     """
-    reads folders and returns all image files in a list
+    reads folders and returns all image files in a list, in frame order
     """
 
     surface_list = []
-    # reg_list = []
 
-    for _, __, img_files in walk(path):
-        for image in img_files:
-            full_path = path + '/' + image
-            # reg_list.append(full_path)
-            image_surf = pygame.image.load(full_path).convert_alpha()
-            surface_list.append(image_surf)
-
-    # print(reg_list)
+    for image in frame_files(path):
+        full_path = path + '/' + image
+        image_surf = pygame.image.load(full_path).convert_alpha()
+        surface_list.append(image_surf)
 
     return surface_list
 
+class AssetCache:
+    """
+    Keeps every decoded image, frame list and sound for the whole process
+    so each asset file is only decoded once, even across game restarts.
+    Frame folders packed into the atlas are sliced from its sheets instead of read file by file
+    """
+    def __init__(self, atlas_index = ATLAS_INDEX):
+
+        self.atlas_index = atlas_index
+        self.atlas = None
+        self.images = {}
+        self.folders = {}
+        self.faded_folders = {}
+        self.sounds = {}
+        self.fonts = {}
+        self.load_times = {}
+
+    def image(self, path, alpha = True):
+        """
+        returns the converted surface for an image file
+        """
+
+        key = (path, alpha)
+        if key not in self.images:
+            surf = pygame.image.load(path)
+            self.images[key] = surf.convert_alpha() if alpha else surf.convert()
+
+        return self.images[key]
+
+    def folder(self, path, flip = False):
+        """
+        returns the shared frame list for a folder, optionally mirrored horizontally
+        """
+
+        key = (path, flip)
+        if key not in self.folders:
+            if flip:
+                frames = [pygame.transform.flip(frame, True, False) for frame in self.folder(path)]
+            elif path in self.packed():
+                frames = self.atlas[path]
+            else:
+                frames = import_folder(path)
+            self.folders[key] = frames
+
+        return self.folders[key]
+
+    def packed(self):
+        """
+        returns the atlas frame folders, loading the sheets on first use, empty without an atlas
+        """
+
+        if self.atlas is None:
+            if self.atlas_index and os_path.exists(self.atlas_index):
+                from atlas import load_atlas
+                self.atlas = load_atlas(self.atlas_index)
+            else:
+                self.atlas = {}
+
+        return self.atlas
+
+    def faded(self, path, alpha, flip = False):
+        """
+        returns copies of a folder's frames with a fixed surface alpha, made once per alpha
+        so sprites pick a render state instead of changing the alpha of shared frames
+        """
+
+        frames = self.folder(path, flip)
+        if alpha == 255:
+            return frames
+
+        key = (path, flip, alpha)
+        if key not in self.faded_folders:
+            faded = []
+            for frame in frames:
+                copy = frame.copy()
+                copy.set_alpha(alpha)
+                faded.append(copy)
+            self.faded_folders[key] = faded
+
+        return self.faded_folders[key]
+
+    def font(self, path, size):
+        """
+        returns the shared Font for a font file and size
+        """
+
+        key = (path, size)
+        if key not in self.fonts:
+            self.fonts[key] = pygame.font.Font(path, size)
+
+        return self.fonts[key]
+
+    def sound(self, path, volume = None):
+        """
+        returns the shared Sound for an audio file
+        """
+
+        if path not in self.sounds:
+            self.sounds[path] = pygame.mixer.Sound(path)
+
+        sound = self.sounds[path]
+        if volume is not None:
+            sound.set_volume(volume)
+
+        return sound
+
+    def preload(self, images = (), folders = (), sounds = (), opaque = (), workers = ASSET_WORKERS, progress = None):
+        """
+        decodes the given assets up front on a pool of worker threads so nothing loads mid game,
+        surfaces are converted on the calling thread since that needs the display.
+        progress is called with (done, total, path) after each file, load_times keeps the seconds per file
+        """
+
+        self.packed()
+        jobs = []
+        jobs += [('image', path) for path in images if (path, True) not in self.images]
+        jobs += [('opaque', path) for path in opaque if (path, False) not in self.images]
+        jobs += [('sound', path) for path in sounds if path not in self.sounds]
+
+        folders = [path for path in folders if (path, False) not in self.folders and path not in self.atlas]
+        for path in folders:
+            jobs += [('frame', f'{path}/{name}') for name in frame_files(path)]
+
+        frames = {}
+        with ThreadPoolExecutor(max_workers = workers) as pool:
+            futures = {pool.submit(decode, kind if kind == 'sound' else 'image', path): (kind, path) for kind, path in jobs}
+            for done, future in enumerate(as_completed(futures), 1):
+                kind, path = futures[future]
+                asset, seconds = future.result()
+
+                start = perf_counter()
+                if kind == 'image':
+                    self.images[(path, True)] = asset.convert_alpha()
+                elif kind == 'opaque':
+                    self.images[(path, False)] = asset.convert()
+                elif kind == 'frame':
+                    frames[path] = asset.convert_alpha()
+                else:
+                    self.sounds[path] = asset
+                self.load_times[path] = seconds + perf_counter() - start
+
+                if progress:
+                    progress(done, len(jobs), path)
+
+        for path in folders:
+            self.folders[(path, False)] = [frames[f'{path}/{name}'] for name in frame_files(path)]
+
+    def load_report(self, count = 10):
+        """
+        returns the total load time and the slowest files as printable lines
+        """
+
+        slowest = sorted(self.load_times.items(), key = lambda item: item[1], reverse = True)[:count]
+        lines = [f'{len(self.load_times)} files in {sum(self.load_times.values()) * 1000:.1f} ms of load time']
+        lines += [f'{seconds * 1000:8.2f} ms  {path}' for path, seconds in slowest]
+
+        return '\n'.join(lines)
+
+    def evict(self, prefix = ''):
+        """
+        drops every cached asset whose path starts with prefix, everything by default
+        """
+
+        for cache in (self.images, self.folders, self.faded_folders, self.fonts):
+            for key in [key for key in cache if key[0].startswith(prefix)]:
+                del cache[key]
+
+        for path in [path for path in self.sounds if path.startswith(prefix)]:
+            del self.sounds[path]
+
+        if self.atlas_index and self.atlas_index.startswith(prefix):
+            self.atlas = None
+
+class TextCache:
+    """
+    Keeps the most recently rendered text surfaces so unchanged labels are blitted, not rendered again.
+    The least recently used surface is dropped once size are held
+    """
+    def __init__(self, size = TEXT_CACHE_SIZE):
+
+        self.size = size
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias = False):
+        """
+        returns the shared surface of a text, callers must not draw onto it
+        """
+
+        key = (text, color, font, antialias)
+        surf = self.surfaces.get(key)
+        if surf is None:
+            surf = font.render(text, antialias, color)
+            self.surfaces[key] = surf
+            if len(self.surfaces) > self.size:
+                self.surfaces.popitem(last = False)
+        else:
+            self.surfaces.move_to_end(key)
+
+        return surf
 
+assets = AssetCache()
+text_cache = TextCache()
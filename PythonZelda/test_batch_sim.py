@@ -0,0 +1,16 @@
+from batch_sim import summarize
+
+def result(frames, fps, exp = 0):
+    return {'frames': frames, 'fps': fps, 'died': False, 'death_seconds': None, 'final_exp': exp}
+
+def test_summary_of_runs_that_played_no_frames():
+    lines = summarize([result(0, 0.0), result(0, 0.0)], 0.5)
+
+    assert lines[0] == '2 runs, 0 frames in 0.50s, 0 frames per second over all workers'
+    assert not any('per run' in line for line in lines)
+
+def test_summary_rates():
+    lines = summarize([result(600, 1200.0, 100), result(300, 600.0, 20)], 1.0)
+
+    assert lines[1] == '900 frames per second per run'
+    assert lines[-1] == 'mean final exp 60'
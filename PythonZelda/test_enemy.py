@@ -0,0 +1,51 @@
+import pytest
+from settings import ENEMY_WAKE_MARGIN, ENEMY_SLEEP_MARGIN
+from headless import HeadlessSim
+
+@pytest.fixture
+def level():
+    sim = HeadlessSim()
+    yield sim.level
+    sim.close()
+
+def stand_off(level, enemy, distance):
+    level.player.rect.center = (enemy.rect.centerx + distance, enemy.rect.centery)
+    level.enemy_sprites.update_ai(level.player)
+
+def awake(level, enemy):
+    return enemy in level.enemy_sprites.members
+
+def test_enemies_sleep_and_wake_with_hysteresis(level):
+    enemy = level.enemy_sprites.sprites()[0]
+    wake_radius = enemy.notice_radius + ENEMY_WAKE_MARGIN
+    sleep_radius = enemy.notice_radius + ENEMY_SLEEP_MARGIN
+    between = (wake_radius + sleep_radius) // 2
+    level.enemy_sprites.wake_all()
+
+    stand_off(level, enemy, between)
+    assert awake(level, enemy)
+
+    stand_off(level, enemy, sleep_radius + 10)
+    assert not awake(level, enemy)
+
+    stand_off(level, enemy, between)
+    assert not awake(level, enemy)
+
+    stand_off(level, enemy, wake_radius - 10)
+    assert awake(level, enemy)
+
+def test_sleeping_enemies_are_not_drawn_or_attacked(level):
+    enemy = level.enemy_sprites.sprites()[0]
+    groups = set(enemy.groups())
+    level.enemy_sprites.wake_all()
+
+    stand_off(level, enemy, enemy.notice_radius + ENEMY_SLEEP_MARGIN + 10)
+    assert enemy.alive()
+    assert enemy.groups() == [level.enemy_sprites]
+    assert enemy not in level.visible_sprites
+    assert enemy not in level.attackable_sprites
+    assert enemy not in level.attackable_sprites.near(enemy.rect)
+
+    stand_off(level, enemy, 0)
+    assert set(enemy.groups()) == groups
+    assert enemy in level.attackable_sprites.near(enemy.rect)
@@ -0,0 +1,59 @@
+import random
+import pygame
+import pytest
+from spatial import cell_range
+from settings import BAKE_KEEP_CHUNKS
+from headless import HeadlessSim
+from batch_sim import HuntPolicy
+
+@pytest.fixture
+def hunting_sim():
+    random.seed(3)
+    policy = HuntPolicy()
+    sim = HeadlessSim(keys = policy)
+    policy.bind(sim.level)
+    yield sim
+    sim.close()
+
+@pytest.fixture
+def baked_sim(monkeypatch):
+    monkeypatch.setattr('level.BAKE_STATIC_LAYERS', True)
+    sim = HeadlessSim()
+    yield sim
+    sim.close()
+
+def look_at(level, pos):
+    level.player.rect.center = pos
+    level.visible_sprites.custom_draw(level.player)
+    return pygame.image.tobytes(level.display_surface, 'RGB')
+
+def test_baked_chunks_are_freed_once_far_off_screen(baked_sim):
+    level = baked_sim.level
+    group = level.visible_sprites
+    start = level.player.rect.center
+    first = look_at(level, start)
+
+    for x in range(0, 3500, 256):
+        look_at(level, (x, start[1]))
+    margin = BAKE_KEEP_CHUNKS * group.chunk_px
+    keep = set(cell_range(group.camera_rect.inflate(margin * 2, margin * 2), group.chunk_px))
+    assert group.chunk_surfs
+    assert set(group.chunk_surfs) <= keep
+
+    #chunks baked again on the way back look the same
+    assert look_at(level, start) == first
+
+def test_merged_tiers_draw_in_centery_order(hunting_sim):
+    level = hunting_sim.level
+    group = level.visible_sprites
+
+    for checkpoint in range(10):
+        hunting_sim.run(60)
+        group.custom_draw(level.player)
+        order = group.draw_order()
+
+        tiles = [entry[2] for chunk in group.static_chunks.values() for entry in chunk]
+        on_screen = [sprite for sprite in tiles + group.dynamic_order if sprite.rect.colliderect(group.camera_rect)]
+        assert len(order) == len(on_screen)
+        assert {id(sprite) for sprite in order} == {id(sprite) for sprite in on_screen}
+        assert [sprite.rect.centery for sprite in order] == [sprite.rect.centery for sprite in sorted(on_screen, key = lambda sprite: sprite.rect.centery)]
@@ -0,0 +1,59 @@
+import numpy
+import pytest
+from mapfile import write_map, compile_map, load_compiled_map, load_map_layers
+from headless import HeadlessSim
+
+def test_compiled_map_reads_back_the_csv_layers(tmp_path):
+    map_path = tmp_path / 'world.zmap'
+    layers = compile_map('map', map_path)
+    compiled = load_compiled_map(map_path)
+
+    assert list(compiled) == list(layers)
+    for name, grid in layers.items():
+        assert numpy.array_equal(compiled[name], grid)
+    compiled.close()
+
+def test_compiled_grids_view_the_mapped_file(tmp_path):
+    map_path = tmp_path / 'world.zmap'
+    compile_map('map', map_path)
+    layers = load_compiled_map(map_path)
+    grid = layers['Grass']
+
+    assert not grid.flags.owndata
+    assert not grid.flags.writeable
+    del grid
+    layers.close()
+    assert layers.buffer.closed
+
+@pytest.mark.parametrize('stream_world', [False, True])
+def test_level_unmaps_its_compiled_map_on_close(tmp_path, monkeypatch, stream_world):
+    map_path = tmp_path / 'world.zmap'
+    compile_map('map', map_path)
+    monkeypatch.setattr('level.STREAM_WORLD', stream_world)
+
+    sim = HeadlessSim(map_source = str(map_path))
+    sim.run(60)
+    sim.close()
+
+    assert sim.level.map_layers.buffer.closed
+
+def test_only_named_layers_are_read(tmp_path):
+    map_path = tmp_path / 'world.zmap'
+    write_map({'Grass': numpy.full((2, 3), 7), 'Entities': numpy.arange(6).reshape(2, 3)}, map_path)
+
+    layers = load_map_layers(str(map_path), ('Entities',))
+    assert list(layers) == ['Entities']
+    assert layers['Entities'].tolist() == [[0, 1, 2], [3, 4, 5]]
+    layers.close()
+    assert list(load_map_layers('map', ('Grass',))) == ['Grass']
+
+def test_layers_must_share_one_size(tmp_path):
+    with pytest.raises(ValueError):
+        write_map({'Grass': numpy.zeros((2, 2)), 'Entities': numpy.zeros((3, 2))}, tmp_path / 'bad.zmap')
+
+def test_other_files_are_rejected(tmp_path):
+    map_path = tmp_path / 'world.zmap'
+    map_path.write_bytes(b'ZREC' + bytes(12))
+
+    with pytest.raises(ValueError):
+        load_compiled_map(map_path)
@@ -0,0 +1,93 @@
+import random
+import pygame
+import snapshot
+import timing
+import controls
+from controls import ScriptedKeys
+from headless import init_headless
+from level import Level
+from settings import RECORD_FLUSH_FRAMES
+from replay import SessionRecorder, SessionReplay, load_session, HEADER, FRAME
+from benchmark_game import FLAME
+
+class FrameClock:
+    def __init__(self):
+        self.ticks = 0
+
+    def __call__(self):
+        return self.ticks
+
+def next_to_an_enemy(level):
+    enemy = level.enemy_sprites.sprites()[0]
+    level.player.hitbox.center = (enemy.rect.centerx + 150, enemy.rect.centery)
+    level.player.rect.center = level.player.hitbox.center
+
+def grass_images(level):
+    return sorted((grass.rect.topleft, level.graphics['grass'].index(grass.image)) for grass in level.grass_sprites)
+
+def test_replay_ends_where_the_recording_did(tmp_path, monkeypatch):
+    clock = FrameClock()
+    script = ScriptedKeys(FLAME)
+    monkeypatch.setattr(pygame.time, 'get_ticks', clock)
+    monkeypatch.setattr(pygame.key, 'get_pressed', script.get_pressed)
+    #recorder and replay take over the game's clock and keys, monkeypatch hands them back afterwards
+    monkeypatch.setattr(timing, 'active_clock', None)
+    monkeypatch.setattr(controls, 'active_keys', None)
+
+    init_headless()
+    session_path = tmp_path / 'session.zrec'
+    world_seed = 5
+    random.seed(world_seed)
+    level = Level()
+    recorder = SessionRecorder(session_path, world_seed)
+    timing.use_clock(recorder)
+    controls.use_keys(recorder)
+    next_to_an_enemy(level)
+
+    frame = 0
+    while frame < 600 and not level.player_dead:
+        toggled = frame in (100, 130)
+        recorder.begin_frame(toggled)
+        if toggled:
+            level.toggle_menu()
+        level.update()
+        #uneven frame times, the replay has to follow the recorded ones
+        clock.ticks += 1000 // 60 + frame % 3
+        script.tick()
+        frame += 1
+    recorder.close()
+    recorded = snapshot.capture(level)
+    recorded_rng = random.getstate()
+    recorded_grass = grass_images(level)
+    level.close()
+
+    replay = SessionReplay(session_path)
+    next_to_an_enemy(replay.level)
+    assert replay.run() == frame
+    assert snapshot.capture(replay.level) == recorded
+    assert random.getstate() == recorded_rng
+    assert grass_images(replay.level) == recorded_grass
+    replay.sim.close()
+
+def test_a_session_cut_short_by_a_crash_still_loads(tmp_path, monkeypatch):
+    clock = FrameClock()
+    monkeypatch.setattr(pygame.time, 'get_ticks', clock)
+    monkeypatch.setattr(pygame.key, 'get_pressed', ScriptedKeys(FLAME).get_pressed)
+
+    session_path = tmp_path / 'session.zrec'
+    recorder = SessionRecorder(session_path, 5, map_source = 'map')
+    for frame in range(RECORD_FLUSH_FRAMES * 2 + 10):
+        recorder.begin_frame()
+        clock.ticks += 16
+
+    #the recorder is never closed, what is on disk is what a crash would leave behind
+    data = session_path.read_bytes()
+    flushed = (len(data) - HEADER.size - len('map')) // FRAME.itemsize
+    assert flushed >= RECORD_FLUSH_FRAMES * 2
+    recorder.close()
+
+    session_path.write_bytes(data + b'\0\0\0')
+    world_seed, seed, start_ticks, map_source, frames = load_session(session_path)
+    assert (world_seed, map_source) == (5, 'map')
+    assert len(frames) == flushed
+    assert frames['ticks'].tolist() == list(range(0, flushed * 16, 16))
@@ -0,0 +1,63 @@
+import random
+import struct
+import pytest
+import snapshot
+from headless import HeadlessSim
+from batch_sim import HuntPolicy
+
+@pytest.fixture
+def sim():
+    random.seed(3)
+    policy = HuntPolicy()
+    sim = HeadlessSim(keys = policy)
+    policy.bind(sim.level)
+    yield sim
+    sim.close()
+
+def test_fresh_level_comes_back_after_play(sim):
+    fresh = snapshot.capture(sim.level)
+    sim.run(600)
+    assert snapshot.capture(sim.level) != fresh
+
+    snapshot.restore(sim.level, fresh)
+    assert snapshot.capture(sim.level) == fresh
+
+def test_running_level_comes_back(sim):
+    sim.run(600)
+    data = snapshot.capture(sim.level)
+    sim.run(300)
+
+    snapshot.restore(sim.level, data)
+    assert snapshot.capture(sim.level) == data
+
+def test_timers_that_never_ran_come_back_as_none(sim):
+    fresh = snapshot.capture(sim.level)
+    sim.run(600)
+    snapshot.restore(sim.level, fresh)
+
+    player = sim.level.player
+    assert player.attack_time is None
+    assert player.hurt_time is None
+    assert player.weapon_switch_time is None
+    assert player.magic_switch_time is None
+    for enemy in sim.level.enemy_sprites:
+        assert enemy.attack_timer is None
+        assert enemy.hit_time is None
+
+def test_exp_comes_back_exactly(sim):
+    sim.level.player.exp = 120
+    snapshot.restore(sim.level, snapshot.capture(sim.level))
+    assert sim.level.player.exp == 120
+    assert isinstance(sim.level.player.exp, int)
+
+    #upgrade costs grow by 1.4 each time, so paying one leaves a fraction
+    sim.level.player.exp = 300 - 140 * 1.4
+    snapshot.restore(sim.level, snapshot.capture(sim.level))
+    assert sim.level.player.exp == 300 - 140 * 1.4
+
+def test_other_versions_are_rejected(sim):
+    data = bytearray(snapshot.capture(sim.level))
+    struct.pack_into('<H', data, 4, 1)
+
+    with pytest.raises(ValueError, match = 'version 1 snapshots are not supported'):
+        snapshot.restore(sim.level, bytes(data))
@@ -0,0 +1,41 @@
+import pygame
+from spatial import SpatialGroup, cell_range
+
+class Box(pygame.sprite.Sprite):
+    def __init__(self, x, y, size = 64):
+        super().__init__()
+        self.rect = pygame.Rect(x, y, size, size)
+        self.hitbox = self.rect.copy()
+
+def test_cell_range_covers_every_overlapped_cell():
+    assert cell_range(pygame.Rect(0, 0, 64, 64), 64) == [(0, 0)]
+    assert cell_range(pygame.Rect(10, 10, 64, 64), 64) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    assert cell_range(pygame.Rect(-10, 0, 20, 64), 64) == [(-1, 0), (0, 0)]
+
+def test_near_returns_close_sprites_in_the_order_they_were_added():
+    far = Box(1000, 1000)
+    second = Box(70, 0)
+    first = Box(0, 0)
+    group = SpatialGroup(far, second, first)
+
+    assert group.near(pygame.Rect(0, 0, 100, 10)) == [second, first]
+    assert group.near(pygame.Rect(500, 500, 10, 10)) == []
+
+def test_killed_sprites_leave_the_grid():
+    box = Box(0, 0)
+    group = SpatialGroup(box)
+    box.kill()
+
+    assert group.near(box.rect) == []
+    assert group.cells == {}
+
+def test_refresh_rebuckets_moved_sprites():
+    moving = Box(0, 0)
+    resting = Box(1000, 0)
+    group = SpatialGroup(moving, resting)
+    moving.hitbox.topleft = (1000, 0)
+
+    assert group.near(resting.hitbox) == [resting]
+    group.refresh()
+    assert group.near(resting.hitbox) == [moving, resting]
+    assert group.near(pygame.Rect(0, 0, 10, 10)) == []
@@ -0,0 +1,75 @@
+import numpy
+import pytest
+from settings import PLAYER_TILE_ID, monster_data
+from mapfile import compile_map
+from headless import HeadlessSim
+
+@pytest.fixture
+def level(tmp_path, monkeypatch):
+    map_path = tmp_path / 'world.zmap'
+    compile_map('map', map_path)
+    monkeypatch.setattr('level.STREAM_WORLD', True)
+
+    sim = HeadlessSim(map_source = str(map_path))
+    yield sim.level
+    sim.close()
+
+def away_from(streamer, *cells):
+    """
+    returns a map corner far enough from the cells that their chunks unload
+    """
+
+    width = streamer.chunk_cols * streamer.chunk_px - 1
+    height = streamer.chunk_rows * streamer.chunk_px - 1
+    for corner in ((0, 0), (width, 0), (0, height), (width, height)):
+        keep = streamer.chunks_around(corner, streamer.radius + 1)
+        if not any(streamer.chunk_of(cell) in keep for cell in cells):
+            return corner
+
+def loaded(streamer, style):
+    return [(cell, sprite) for chunk in streamer.loaded.values() for kind, cell, sprite in chunk if kind == style]
+
+def test_chunks_are_read_from_the_mapped_file(level):
+    assert level.streamer.loaded
+    for layout in level.layouts.values():
+        assert not layout.flags.owndata
+
+def test_find_reads_band_by_band_to_the_first_cell(level):
+    rows, cols = numpy.nonzero(level.layouts['entities'] == PLAYER_TILE_ID)
+
+    assert level.streamer.find('entities', PLAYER_TILE_ID) == (rows[0], cols[0])
+    assert level.streamer.find('entities', -2) is None
+
+def test_cut_grass_stays_cut_after_its_chunk_comes_back(level):
+    streamer = level.streamer
+    home = level.player.rect.center
+    cut_cell, cut = loaded(streamer, 'grass')[0]
+    chunk = streamer.chunk_of(cut_cell)
+    cells = {cell for cell, sprite in loaded(streamer, 'grass') if streamer.chunk_of(cell) == chunk}
+    cut.kill()
+
+    streamer.update(away_from(streamer, cut_cell), wait = True)
+    assert chunk not in streamer.loaded
+    streamer.update(home, wait = True)
+
+    back = {cell for cell, sprite in loaded(streamer, 'grass') if streamer.chunk_of(cell) == chunk}
+    assert back == cells - {cut_cell}
+
+def test_enemies_live_on_while_their_chunk_is_away(level):
+    streamer = level.streamer
+    home = level.player.rect.center
+    (hurt_cell, hurt), (killed_cell, killed) = loaded(streamer, 'entities')[:2]
+    hurt.health -= 1
+    killed.kill()
+
+    streamer.update(away_from(streamer, hurt_cell, killed_cell), wait = True)
+    assert streamer.chunk_of(hurt_cell) not in streamer.loaded
+    assert hurt.alive()
+    assert streamer.kept[('entities', hurt_cell)] is hurt
+    streamer.update(home, wait = True)
+
+    assert hurt.alive()
+    assert hurt.health == monster_data[hurt.monster_name]['health'] - 1
+    spawns = [tuple(enemy.spawn_pos) for enemy in level.enemy_sprites]
+    assert spawns.count(tuple(hurt.spawn_pos)) == 1
+    assert tuple(killed.spawn_pos) not in spawns
@@ -0,0 +1,23 @@
+import pygame
+from support import TextCache
+
+def test_text_cache_drops_the_least_recently_used_surface():
+    pygame.font.init()
+    font = pygame.font.Font(None, 20)
+    cache = TextCache(size = 2)
+
+    first = cache.render(font, 'first', 'white')
+    second = cache.render(font, 'second', 'white')
+    assert cache.render(font, 'first', 'white') is first
+
+    cache.render(font, 'third', 'white')
+    assert len(cache.surfaces) == 2
+    assert cache.render(font, 'first', 'white') is first
+    assert cache.render(font, 'second', 'white') is not second
+
+def test_text_cache_keys_on_color():
+    pygame.font.init()
+    font = pygame.font.Font(None, 20)
+    cache = TextCache()
+
+    assert cache.render(font, 'exp', 'white') is not cache.render(font, 'exp', 'black')
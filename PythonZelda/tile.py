@@ -7,7 +7,7 @@ class Tile(pygame.sprite.Sprite):
     """
 
     def __init__(self,pos,groups,sprite_type,surface = pygame.Surface((TILESIZE,TILESIZE))):
-        super().__init__(groups)
+        super().__init__()
 
         self.sprite_type = sprite_type
         y_offset = HITBOX_OFFSET[sprite_type]
@@ -17,8 +17,48 @@ class Tile(pygame.sprite.Sprite):
         else:
             self.rect = self.image.get_rect(topleft = pos)
         self.hitbox = self.rect.inflate(0,y_offset)
+
+        #joined last so spatial groups can bucket the tile by its hitbox
+        self.add(groups)
         
 
 
 
 
+
+
+class StaticTile:
+    """
+    Slotted record for tiles that never animate or get hit, boundaries and objects.
+    It is not a sprite, groups that draw or collide with it hold it through add_static
+    """
+    __slots__ = ('sprite_type', 'image', 'rect', 'hitbox', 'containers')
+
+    def __init__(self, pos, containers, sprite_type, surface = None):
+
+        self.sprite_type = sprite_type
+        self.image = surface
+        if surface is None:
+            self.rect = pygame.Rect(pos, (TILESIZE,TILESIZE))
+        elif sprite_type == 'object':
+            self.rect = surface.get_rect(topleft = (pos[0],pos[1] - TILESIZE))
+        else:
+            self.rect = surface.get_rect(topleft = pos)
+
+        #tiles without an offset share one rect for drawing and collision
+        y_offset = HITBOX_OFFSET[sprite_type]
+        self.hitbox = self.rect.inflate(0,y_offset) if y_offset else self.rect
+
+        self.containers = tuple(containers)
+        for container in self.containers:
+            container.add_static(self)
+
+    def alive(self):
+
+        return bool(self.containers)
+
+    def kill(self):
+
+        for container in self.containers:
+            container.remove_static(self)
+        self.containers = ()
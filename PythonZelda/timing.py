@@ -0,0 +1,48 @@
+"""
+File holds the clock all game timers read from
+By default that is pygame's wall clock, headless runs swap in a SimClock
+"""
+import pygame
+from settings import *
+
+class SimClock:
+    """
+    Fixed timestep clock, time only moves when tick is called.
+    Has the same tick method as pygame.time.Clock so game loops can use either
+    """
+    def __init__(self, step = 1000 / FPS):
+
+        self.step = step
+        self.time = 0
+
+    def get_ticks(self):
+
+        return int(self.time)
+
+    def tick(self, framerate = 0):
+        """
+        advances time by one step, the framerate is ignored
+        """
+
+        self.time += self.step
+        return self.step
+
+active_clock = None
+
+def use_clock(clock):
+    """
+    makes every timer read from clock, None goes back to wall time
+    """
+
+    global active_clock
+    active_clock = clock
+
+def get_ticks():
+    """
+    returns the current game time in milliseconds
+    """
+
+    if active_clock:
+        return active_clock.get_ticks()
+
+    return pygame.time.get_ticks()
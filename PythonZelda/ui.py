@@ -1,12 +1,18 @@
 import pygame
 from settings import *
+from support import assets, text_cache
 
 class Ui:
     def __init__(self):
         
         #general
         self.display_surface = pygame.display.get_surface()
-        self.font = pygame.font.Font(UI_FONT, UI_FONT_SIZE)
+        self.font = assets.font(UI_FONT, UI_FONT_SIZE)
+
+        #cached hud layer, only redrawn when the player state it shows changes
+        self.layer = pygame.Surface(self.display_surface.get_size(), pygame.SRCALPHA)
+        self.hud_state = None
+        self.hud_rects = []
 
         #bar setup
         self.health_bar_rect = pygame.Rect(10, 10, HEALTH_BAR_WIDTH, BAR_HEIGHT)
@@ -16,47 +22,57 @@ class Ui:
         self.weapon_graphics = []
         for weapon in weapon_data.values():
             path = weapon['graphic']
-            weapon = pygame.image.load(path).convert_alpha()
+            weapon = assets.image(path)
             self.weapon_graphics.append(weapon)
 
         self.magic_graphics = []
         for magic in magic_data.values():
             path = magic['graphic']
-            magic = pygame.image.load(path).convert_alpha()
+            magic = assets.image(path)
             self.magic_graphics.append(magic)
 
+    def bar_width(self, current, max_ammount, bg_rect):
+        """
+        converts a stat to the pixel width of its bar
+        """
+
+        ratio = current/max_ammount
+        return int(bg_rect.width * ratio)
+
     def show_bar(self, current, max_ammount, bg_rect, color):
         #draw bg
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, bg_rect)
+        pygame.draw.rect(self.layer, UI_BG_COLOR, bg_rect)
 
         #convert stat to pixel
-        ratio = current/max_ammount
-        current_width = bg_rect.width * ratio
         current_rect = bg_rect.copy()
-        current_rect.width = current_width
+        current_rect.width = self.bar_width(current, max_ammount, bg_rect)
 
         #draw the bar
-        pygame.draw.rect(self.display_surface, color, current_rect)
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, current_rect, 3)
+        pygame.draw.rect(self.layer, color, current_rect)
+        pygame.draw.rect(self.layer, UI_BORDER_COLOR, current_rect, 3)
+
+        return bg_rect
 
     def show_exp(self, exp):
 
-        text_surf = self.font.render(str(int(exp)), False, TEXT_COLOR)
+        text_surf = text_cache.render(self.font, str(int(exp)), TEXT_COLOR)
         text_rect = text_surf.get_rect(bottomright = (WIDTH - 20, HEIGHT - 20))
 
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, text_rect.inflate(20,20))
-        self.display_surface.blit(text_surf, text_rect)
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, text_rect.inflate(20,20), 3)
+        pygame.draw.rect(self.layer, UI_BG_COLOR, text_rect.inflate(20,20))
+        self.layer.blit(text_surf, text_rect)
+        pygame.draw.rect(self.layer, UI_BORDER_COLOR, text_rect.inflate(20,20), 3)
+
+        return text_rect.inflate(20,20)
 
     def selection_box(self, left, top, has_switched):
 
         bg_rect = pygame.Rect(left, top, ITEM_BOX_SIZE, ITEM_BOX_SIZE)
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, bg_rect)
+        pygame.draw.rect(self.layer, UI_BG_COLOR, bg_rect)
 
         if has_switched:
-            pygame.draw.rect(self.display_surface, UI_BORDER_COLOR_ACTIVE, bg_rect, 3)
+            pygame.draw.rect(self.layer, UI_BORDER_COLOR_ACTIVE, bg_rect, 3)
         else:
-            pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, bg_rect, 3)
+            pygame.draw.rect(self.layer, UI_BORDER_COLOR, bg_rect, 3)
 
         return bg_rect
 
@@ -66,7 +82,9 @@ class Ui:
         weapon_surf = self.weapon_graphics[weapon_index]
         weapon_rect = weapon_surf.get_rect(center = bg_rect.center)
 
-        self.display_surface.blit(weapon_surf, weapon_rect)
+        self.layer.blit(weapon_surf, weapon_rect)
+
+        return bg_rect.union(weapon_rect)
 
     def magic_overlay(self, magic_index, has_switched):
 
@@ -74,14 +92,43 @@ class Ui:
         magic_surf = self.magic_graphics[magic_index]
         magic_rect = magic_surf.get_rect(center = bg_rect.center)
 
-        self.display_surface.blit(magic_surf, magic_rect)
+        self.layer.blit(magic_surf, magic_rect)
 
-    def display(self, player):
-        
-        self.show_bar(player.health, player.stats['health'], self.health_bar_rect, HEALTH_COLOR)
-        self.show_bar(player.energy, player.stats['energy'], self.energy_bar_rect, ENERGY_COLOR)
+        return bg_rect.union(magic_rect)
 
-        self.show_exp(player.exp)
+    def redraw(self, player):
+        """
+        draws the whole hud onto the cached layer and returns the rects it covers
+        """
 
-        self.weapon_overlay(player.weapon_index, not player.can_switch_weapon)
-        self.magic_overlay(player.magic_index, not player.can_switch_magic)
\ No newline at end of file
+        self.layer.fill((0,0,0,0))
+
+        return [
+            self.show_bar(player.health, player.stats['health'], self.health_bar_rect, HEALTH_COLOR),
+            self.show_bar(player.energy, player.stats['energy'], self.energy_bar_rect, ENERGY_COLOR),
+            self.show_exp(player.exp),
+            self.weapon_overlay(player.weapon_index, not player.can_switch_weapon),
+            self.magic_overlay(player.magic_index, not player.can_switch_magic)]
+
+    def display(self, player):
+        """
+        blits the cached hud, redrawing it first when what it shows changed,
+        returns the screen rects that changed since the last frame
+        """
+
+        #bars are keyed by their pixel width, so slowly regenerating energy does not redraw every frame
+        state = (self.bar_width(player.health, player.stats['health'], self.health_bar_rect),
+            self.bar_width(player.energy, player.stats['energy'], self.energy_bar_rect), int(player.exp),
+            player.weapon_index, player.magic_index, player.can_switch_weapon, player.can_switch_magic)
+
+        changed = []
+        if state != self.hud_state:
+            self.hud_state = state
+            changed = self.hud_rects
+            self.hud_rects = self.redraw(player)
+            changed = changed + self.hud_rects
+
+        for rect in self.hud_rects:
+            self.display_surface.blit(self.layer, rect, rect)
+
+        return changed
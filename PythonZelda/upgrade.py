@@ -1,5 +1,8 @@
 import pygame
 from settings import *
+from timing import get_ticks
+from controls import get_pressed
+from support import assets, text_cache
 
 class Upgrade:
 	def __init__(self, player):
@@ -9,7 +12,7 @@ class Upgrade:
 		self.attribute_num = len(player.stats)
 		self.attribute_names = list(player.stats.keys())
 		self.max_values = list(player.max_stats.values())
-		self.font = pygame.font.Font(UI_FONT, UI_FONT_SIZE)
+		self.font = assets.font(UI_FONT, UI_FONT_SIZE)
 
 		#item creation
 		self.height = self.display_surface.get_size()[1] * 0.8
@@ -23,31 +26,31 @@ class Upgrade:
 
 	def input(self):
 
-		keys = pygame.key.get_pressed()
+		keys = get_pressed()
 
 		if self.can_move:
 			if keys[pygame.K_RIGHT]:
 				self.selection_index += 1
 				self.can_move = False
-				self.selection_time = pygame.time.get_ticks()
+				self.selection_time = get_ticks()
 				if self.selection_index > self.attribute_num - 1:
 					self.selection_index = 0
 			elif keys[pygame.K_LEFT]:
 				self.selection_index -= 1
 				self.can_move = False
-				self.selection_time = pygame.time.get_ticks()
+				self.selection_time = get_ticks()
 				if self.selection_index < 0:
 					self.selection_index = self.attribute_num - 1
 
 			if keys[pygame.K_SPACE]:
 				self.can_move = False
-				self.selection_time = pygame.time.get_ticks()
+				self.selection_time = get_ticks()
 				self.item_list[self.selection_index].trigger(self.player)
 
 	def selection_cooldown(self):
 
 		if not self.can_move:
-			current_time = pygame.time.get_ticks()
+			current_time = get_ticks()
 			if current_time - self.selection_time >= 300:
 				self.can_move = True
 
@@ -66,11 +69,13 @@ class Upgrade:
 			item = Item(left, top, self.width, self.height, index, self.font)
 			self.item_list.append(item)
 
-	def display(self):
+	def update(self):
 
 		self.input()
 		self.selection_cooldown()
 
+	def display(self):
+
 		for index, item in enumerate(self.item_list):
 			name = self.attribute_names[index]
 			value = self.player.get_value_by_index(index)
@@ -93,11 +98,11 @@ class Item:
 			color = TEXT_COLOR
 
 		#title
-		title_surf = self.font.render(name, False, color)
+		title_surf = text_cache.render(self.font, name, color)
 		title_rect = title_surf.get_rect(midtop = self.rect.midtop + pygame.math.Vector2(0,20))
 
 		#cost
-		cost_surf = self.font.render(f'{int(cost)}', False, color)
+		cost_surf = text_cache.render(self.font, f'{int(cost)}', color)
 		cost_rect = cost_surf.get_rect(midbottom = self.rect.midbottom - pygame.math.Vector2(0,20))
 
 		#draw
@@ -1,15 +1,36 @@
 import pygame
+from settings import *
+from support import assets
+
+def build_weapon_atlas():
+    """
+    loads the graphic of every weapon in every direction into one lookup table
+    """
+
+    atlas = {}
+    for weapon in weapon_data.keys():
+        for direction in ('up', 'down', 'left', 'right'):
+            atlas[(weapon, direction)] = assets.image(f'graphics/weapons/{weapon}/{direction}.png')
+
+    return atlas
 
 class Weapon(pygame.sprite.Sprite):
-    def __init__(self,player,groups):
+    def __init__(self,player,groups,atlas):
         super().__init__(groups)
 
         self.sprite_type = 'weapon'
+        self.atlas = atlas
+        self.place(player)
+
+    def place(self, player):
+        """
+        picks the graphic for the players weapon and facing, then positions it
+        """
+
         direction = player.status.split('_')[0]
 
         #graphics
-        full_path = f'graphics/weapons/{player.weapon}/{direction}.png'
-        self.image = pygame.image.load(full_path).convert_alpha()
+        self.image = self.atlas[(player.weapon, direction)]
 
         # places weapon sprite during attack
         if direction == 'right':
@@ -19,4 +40,4 @@ class Weapon(pygame.sprite.Sprite):
         elif direction == 'up':
             self.rect = self.image.get_rect(midbottom = player.rect.midtop + pygame.math.Vector2(-10,0))
         elif direction == 'down':
-            self.rect = self.image.get_rect(midtop = player.rect.midbottom + pygame.math.Vector2(-10,0))
\ No newline at end of file
+            self.rect = self.image.get_rect(midtop = player.rect.midbottom + pygame.math.Vector2(-10,0))